@@ -0,0 +1,208 @@
+"""Process many lectures in one process with a resumable manifest."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+from rich.console import Console
+
+from .config import IngestRequest, Settings, resolve_settings
+from .pipeline import PipelineRunner, StageLimits
+
+console = Console()
+
+VIDEO_SUFFIXES = (".mp4", ".mkv", ".webm", ".mov", ".avi", ".m4v")
+BATCH_STATUSES = ("pending", "running", "done", "failed")
+
+
+@dataclass
+class BatchItem:
+    """One lecture of a batch and its progress."""
+
+    source_type: str
+    source: str
+    status: str = "pending"
+    video_id: str | None = None
+    outputs: Dict[str, str] = field(default_factory=dict)
+    error: str | None = None
+    seconds: float | None = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.source_type}:{self.source}"
+
+
+def guess_source_type(source: str) -> str:
+    if "drive.google.com" in source:
+        return "gdrive"
+    if source.startswith(("http://", "https://")):
+        return "youtube"
+    return "local"
+
+
+def expand_sources(spec: str, settings: Settings | None = None) -> List[IngestRequest]:
+    """Turn a directory, list file or playlist URL into ingest requests.
+
+    List files hold one source per line, optionally prefixed by its type
+    (``youtube https://…``); blank lines and ``#`` comments are ignored and
+    relative paths are resolved against the list file's directory.
+    """
+    settings = settings or resolve_settings()
+    if spec.startswith(("http://", "https://")):
+        if guess_source_type(spec) == "youtube" and "list=" in spec:
+            urls = _playlist_urls(spec, settings)
+            return [IngestRequest(source_type="youtube", source=url) for url in urls]
+        return [IngestRequest(source_type=guess_source_type(spec), source=spec)]
+
+    path = Path(spec).expanduser()
+    if path.is_dir():
+        videos = sorted(p for p in path.iterdir() if p.suffix.lower() in VIDEO_SUFFIXES)
+        return [IngestRequest(source_type="local", source=str(p.resolve())) for p in videos]
+    if path.suffix.lower() in VIDEO_SUFFIXES:
+        return [IngestRequest(source_type="local", source=str(path.resolve()))]
+    if not path.is_file():
+        msg = f"Batch source not found: {spec}"
+        raise FileNotFoundError(msg)
+
+    requests: List[IngestRequest] = []
+    for raw in path.read_text().splitlines():
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split(maxsplit=1)
+        if len(parts) == 2 and parts[0] in ("local", "youtube", "gdrive"):
+            source_type, source = parts
+        else:
+            source_type, source = guess_source_type(line), line
+        if source_type == "local":
+            source = str((path.parent / Path(source).expanduser()).resolve())
+        requests.append(IngestRequest(source_type=source_type, source=source))
+    return requests
+
+
+def _playlist_urls(url: str, settings: Settings) -> List[str]:
+    cmd = [settings.yt_downloader, "--flat-playlist", "--print", "url", url]
+    if settings.youtube_cookie_file:
+        cmd += ["--cookies", str(settings.youtube_cookie_file)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    return [line.strip() for line in out.stdout.splitlines() if line.strip()]
+
+
+class BatchManifest:
+    """JSON record of every lecture in a batch, rewritten atomically on each change."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.items: Dict[str, BatchItem] = {}
+        self._lock = threading.Lock()
+        if path.exists():
+            for data in json.loads(path.read_text())["items"]:
+                item = BatchItem(**data)
+                self.items[item.key] = item
+
+    @staticmethod
+    def default_path(spec: str, settings: Settings) -> Path:
+        """Manifest location derived from the batch spec, so reruns resume."""
+        digest = hashlib.sha256(spec.encode()).hexdigest()[:12]
+        return settings.paths.processed_dir / "batches" / f"{digest}.json"
+
+    def add(self, requests: Iterable[IngestRequest]) -> List[BatchItem]:
+        """Register ``requests`` (keeping recorded progress) and return their items."""
+        selected: List[BatchItem] = []
+        with self._lock:
+            for request in requests:
+                item = BatchItem(request.source_type, request.source)
+                item = self.items.setdefault(item.key, item)
+                selected.append(item)
+            self._save()
+        return selected
+
+    def update(self, item: BatchItem, **changes: object) -> None:
+        with self._lock:
+            for name, value in changes.items():
+                setattr(item, name, value)
+            self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"updated_at": time.time(), "items": [asdict(i) for i in self.items.values()]}
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2))
+        os.replace(tmp_path, self.path)
+
+
+class BatchRunner:
+    """Run lectures concurrently on one shared pipeline runner.
+
+    Sharing the runner keeps models loaded across lectures; ``BatchConfig``
+    bounds how many lectures run at once and how many of them may be in each
+    resource-heavy stage at the same time.
+    """
+
+    def __init__(self, settings: Settings | None = None) -> None:
+        self.settings = settings or resolve_settings()
+        self.runner = PipelineRunner(self.settings, StageLimits.from_config(self.settings.batch))
+
+    def run(
+        self,
+        requests: Iterable[IngestRequest],
+        manifest: BatchManifest,
+        on_update: Callable[[BatchItem], None] | None = None,
+    ) -> List[BatchItem]:
+        items = manifest.add(requests)
+        # Anything not finished, including lectures interrupted while running, is redone.
+        todo = [item for item in items if item.status != "done"]
+        console.log(
+            f"[bold green]Batch[/] {len(items)} lectures, {len(items) - len(todo)} already done"
+        )
+
+        def process(item: BatchItem) -> None:
+            manifest.update(item, status="running", error=None)
+            if on_update:
+                on_update(item)
+            start = time.perf_counter()
+            request = IngestRequest(source_type=item.source_type, source=item.source)
+            try:
+                result = self.runner.run(request)
+            except Exception as exc:
+                console.log(f"[bold red]Batch item failed[/] {item.source}")
+                traceback.print_exc()
+                manifest.update(
+                    item, status="failed", error=str(exc), seconds=time.perf_counter() - start
+                )
+            else:
+                manifest.update(
+                    item,
+                    status="done",
+                    video_id=result.video_id,
+                    outputs={
+                        "slide_pdf": str(result.slide_pdf),
+                        "transcript_pdf": str(result.transcript_pdf),
+                        "combined_pdf": str(result.combined_pdf),
+                        "metrics": str(result.metrics_path),
+                    },
+                    seconds=time.perf_counter() - start,
+                )
+            if on_update:
+                on_update(item)
+
+        workers = max(self.settings.batch.concurrent_videos, 1)
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+                list(pool.map(process, todo))
+        finally:
+            self.runner.transcriber.close()
+        return items
+
+
+__all__ = ["BatchRunner", "BatchManifest", "BatchItem", "expand_sources"]
@@ -0,0 +1,251 @@
+"""Content-addressed cache for pipeline stage outputs."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, TypeVar
+
+from rich.console import Console
+
+from .config import CacheConfig, Settings, resolve_settings
+
+console = Console()
+
+T = TypeVar("T")
+
+_CHUNK_SIZE = 1 << 20
+_digest_memo: Dict[tuple[str, int, int], str] = {}
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's content, memoized per path/size/mtime within the process."""
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _digest_memo:
+        return _digest_memo[memo_key]
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while chunk := handle.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    _digest_memo[memo_key] = digest.hexdigest()
+    return _digest_memo[memo_key]
+
+
+def _tree_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+@dataclass
+class CacheStats:
+    """Cache hits and misses by stage, e.g. of one pipeline run."""
+
+    hits: Dict[str, int] = field(default_factory=dict)
+    misses: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, stage: str, hit: bool) -> None:
+        counter = self.hits if hit else self.misses
+        counter[stage] = counter.get(stage, 0) + 1
+
+    def to_dict(self) -> Dict[str, Dict[str, int]]:
+        return {"hits": dict(self.hits), "misses": dict(self.misses)}
+
+
+class StageCache:
+    """Store stage outputs under keys derived from input content and config.
+
+    Each entry is a directory holding ``data.json`` plus any files the stage
+    produced. ``index.json`` tracks entry sizes and last use so the cache can be
+    kept under ``CacheConfig.max_bytes`` by evicting least recently used entries.
+    """
+
+    def __init__(self, settings: Settings | None = None) -> None:
+        self.settings = settings or resolve_settings()
+        self.cfg: CacheConfig = self.settings.cache
+        self.root = self.settings.paths.cache_dir
+        self.index_path = self.root / "index.json"
+        # Totals over the process lifetime; runs pass their own CacheStats to fetch().
+        self.totals = CacheStats()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.cfg.enabled
+
+    @staticmethod
+    def key(stage: str, content_hash: str, config: Any) -> str:
+        payload = json.dumps(
+            {"stage": stage, "input": content_hash, "config": config},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def entry_dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def contains(self, key: str) -> bool:
+        return self.enabled and (self.entry_dir(key) / "data.json").exists()
+
+    def fetch(
+        self,
+        stage: str,
+        key: str,
+        compute: Callable[[], T],
+        encode: Callable[[T, Path], Any],
+        decode: Callable[[Any, Path], T | None],
+        stats: CacheStats | None = None,
+    ) -> T:
+        """Return the cached value for ``key`` or compute and store it.
+
+        ``encode`` turns the value into JSON data and may copy files into the
+        entry directory; ``decode`` rebuilds it and returns ``None`` when the
+        entry is no longer usable. The hit or miss is also counted in ``stats``.
+        """
+        if self.enabled:
+            value = self._load(key, decode)
+            if value is not None:
+                self._record(stage, key, True, stats)
+                return value
+            self._record(stage, key, False, stats)
+        value = compute()
+        if self.enabled:
+            self._store(key, value, encode)
+        return value
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hits and misses since the process started."""
+        with self._lock:
+            return self.totals.to_dict()
+
+    # region helpers
+    def _load(self, key: str, decode: Callable[[Any, Path], T | None]) -> T | None:
+        entry = self.entry_dir(key)
+        data_path = entry / "data.json"
+        if not data_path.exists():
+            return None
+        try:
+            value = decode(json.loads(data_path.read_text()), entry)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if value is not None:
+            with self._lock:
+                index = self._read_index()
+                if key in index:
+                    index[key]["last_used"] = time.time()
+                    self._write_index(index)
+        return value
+
+    def _store(self, key: str, value: T, encode: Callable[[T, Path], Any]) -> None:
+        entry = self.entry_dir(key)
+        shutil.rmtree(entry, ignore_errors=True)
+        entry.mkdir(parents=True, exist_ok=True)
+        data = encode(value, entry)
+        tmp_path = entry / "data.json.tmp"
+        tmp_path.write_text(json.dumps(data))
+        os.replace(tmp_path, entry / "data.json")
+        with self._lock:
+            index = self._read_index()
+            index[key] = {"size": _tree_size(entry), "last_used": time.time()}
+            self._evict(index, keep=key)
+            self._write_index(index)
+
+    def _evict(self, index: Dict[str, Dict[str, float]], keep: str) -> None:
+        total = sum(meta["size"] for meta in index.values())
+        for key in sorted(index, key=lambda k: index[k]["last_used"]):
+            if total <= self.cfg.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= index.pop(key)["size"]
+            shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+            console.log(f"[yellow]Evicted cache entry[/] {key}")
+
+    def _record(self, stage: str, key: str, hit: bool, stats: CacheStats | None) -> None:
+        with self._lock:
+            self.totals.record(stage, hit)
+            if stats is not None:
+                stats.record(stage, hit)
+        label = "[green]hit[/]" if hit else "[yellow]miss[/]"
+        console.log(f"[cyan]Cache[/] {stage} {label} ({key[:12]})")
+
+    def _read_index(self) -> Dict[str, Dict[str, float]]:
+        if not self.index_path.exists():
+            return {}
+        try:
+            return json.loads(self.index_path.read_text())
+        except ValueError:
+            return {}
+
+    def _write_index(self, index: Dict[str, Dict[str, float]]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(index))
+        os.replace(tmp_path, self.index_path)
+
+    # endregion
+
+
+# Linux FICLONE ioctl: share the source's extents (btrfs, XFS, bcachefs).
+_FICLONE = 0x40049409
+
+
+def reflink(src: Path, target: Path) -> None:
+    """Copy-on-write clone of ``src``; raises ``OSError`` where unsupported."""
+    import fcntl
+
+    with src.open("rb") as source, target.open("wb") as clone:
+        try:
+            fcntl.ioctl(clone.fileno(), _FICLONE, source.fileno())
+        except OSError:
+            clone.close()
+            target.unlink(missing_ok=True)
+            raise
+
+
+def place_file(src: Path, target: Path, allow_symlink: bool = False) -> str:
+    """Make ``src`` available at ``target`` as cheaply as the filesystem allows.
+
+    Tries a hardlink, then a reflink, then (if allowed) a symlink, and finally
+    copies. Returns the method used.
+    """
+    target.unlink(missing_ok=True)
+    try:
+        os.link(src, target)
+        return "hardlink"
+    except OSError:
+        pass
+    try:
+        reflink(src, target)
+        shutil.copystat(src, target)
+        return "reflink"
+    except (OSError, ImportError):
+        pass
+    if allow_symlink:
+        try:
+            target.symlink_to(src.resolve())
+            return "symlink"
+        except OSError:
+            pass
+    shutil.copy2(src, target)
+    return "copy"
+
+
+def link_or_copy(sources: Iterable[Path], destination: Path) -> Dict[Path, Path]:
+    """Place files in ``destination`` via hardlink or reflink when possible, else copy."""
+    destination.mkdir(parents=True, exist_ok=True)
+    placed: Dict[Path, Path] = {}
+    for src in sources:
+        target = destination / src.name
+        place_file(src, target)
+        placed[src] = target
+    return placed
+
+
+__all__ = ["CacheStats", "StageCache", "file_digest", "link_or_copy", "place_file", "reflink"]
@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+from pathlib import Path
+
 import typer
 from rich import print as rprint
 
 from .config import IngestRequest, resolve_settings
-from .pipeline import PipelineRunner
+
+# Keep module import light: the pipeline (and the model and media stacks behind
+# it) is imported only by the commands that run it.
 
 cli = typer.Typer(add_completion=False, help="Video Lectures to Searchable PDFs")
 app = cli  # Expose as `app` for Typer entrypoint in pyproject.toml
@@ -19,6 +23,8 @@ def run(
 ) -> None:
     """Execute the end-to-end pipeline."""
 
+    from .pipeline import PipelineRunner
+
     settings = resolve_settings()
     runner = PipelineRunner(settings)
     req = IngestRequest(source_type=source_type, source=source)
@@ -27,10 +33,81 @@ def run(
         f"[bold green]Pipeline complete[/]\n"
         f"Slide PDF: {result.slide_pdf}\n"
         f"Transcript PDF: {result.transcript_pdf}\n"
-        f"Combined PDF: {result.combined_pdf}"
+        f"Combined PDF: {result.combined_pdf}\n"
+        f"Stage metrics: {result.metrics_path}"
     )
 
 
+@cli.command()
+def batch(
+    spec: str = typer.Argument(..., help="Directory of videos, list file or playlist URL"),
+    manifest: Path = typer.Option(
+        None, "--manifest", "-m", help="Progress file (default: derived from the source)"
+    ),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="Lectures processed at once"),
+) -> None:
+    """Process many lectures in one process; rerunning resumes unfinished ones."""
+
+    from rich.table import Table
+
+    from .batch import BatchManifest, BatchRunner, expand_sources
+
+    settings = resolve_settings()
+    if jobs is not None:
+        settings.batch.concurrent_videos = jobs
+    requests = expand_sources(spec, settings)
+    if not requests:
+        rprint("[yellow]No videos found[/]")
+        raise typer.Exit(1)
+    manifest_path = manifest or BatchManifest.default_path(spec, settings)
+    rprint(f"Manifest: {manifest_path}")
+    items = BatchRunner(settings).run(requests, BatchManifest(manifest_path))
+
+    table = Table("Source", "Status", "Video", "Seconds")
+    for item in items:
+        seconds = f"{item.seconds:.0f}" if item.seconds is not None else ""
+        table.add_row(item.source, item.status, item.video_id or "", seconds)
+    rprint(table)
+    if any(item.status != "done" for item in items):
+        raise typer.Exit(1)
+
+
+@cli.command()
+def search(
+    query: str = typer.Argument(..., help="Words to look for in slides and transcripts"),
+    limit: int = typer.Option(20, "--limit", "-n", help="Maximum number of hits"),
+    video_id: str = typer.Option(None, "--video", help="Restrict to one video id"),
+    semantic: bool = typer.Option(
+        False, "--semantic", help="Rank chunks of the vector index by similarity"
+    ),
+) -> None:
+    """Search slide text and transcripts of processed videos."""
+
+    from rich.markup import escape
+    from rich.table import Table
+
+    from .search import SearchIndex
+    from .vectors import VectorIndex
+
+    settings = resolve_settings()
+    index = VectorIndex(settings) if semantic else SearchIndex(settings)
+    try:
+        hits = index.search(query, limit=limit, video_id=video_id)
+    except ValueError as exc:
+        if video_id is None:
+            raise
+        raise typer.BadParameter(str(exc), param_hint="--video") from exc
+    if not hits:
+        rprint("[yellow]No matches[/]")
+        return
+    table = Table("Video", "Kind", "Time", "PDF page", "Match")
+    for hit in hits:
+        table.add_row(
+            hit.video_id, hit.kind, f"{hit.start:.1f}s", f"{hit.pdf}#{hit.page}", escape(hit.text)
+        )
+    rprint(table)
+
+
 @cli.command()
 def paths() -> None:
     """Show configured directories."""
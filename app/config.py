@@ -16,10 +16,21 @@ class StoragePaths(BaseModel):
     raw_dir: Path = Field(default_factory=lambda: Path.cwd() / "data" / "raw")
     processed_dir: Path = Field(default_factory=lambda: Path.cwd() / "data" / "processed")
     temp_dir: Path = Field(default_factory=lambda: Path.cwd() / "data" / "tmp")
+    cache_dir: Path = Field(default_factory=lambda: Path.cwd() / "data" / "cache")
+    jobs_db: Path = Field(default_factory=lambda: Path.cwd() / "data" / "jobs.sqlite3")
+    search_db: Path = Field(default_factory=lambda: Path.cwd() / "data" / "search.sqlite3")
+    vector_dir: Path = Field(default_factory=lambda: Path.cwd() / "data" / "vectors")
 
     def ensure(self) -> None:
         """Create directories if they do not exist."""
-        for target in (self.root, self.raw_dir, self.processed_dir, self.temp_dir):
+        for target in (
+            self.root,
+            self.raw_dir,
+            self.processed_dir,
+            self.temp_dir,
+            self.cache_dir,
+            self.vector_dir,
+        ):
             target.mkdir(parents=True, exist_ok=True)
 
 
@@ -38,13 +49,53 @@ class IngestRequest(BaseModel):
         return value
 
 
+class IngestConfig(BaseModel):
+    """How sources are fetched into the raw directory."""
+
+    # Fetch YouTube audio-only and video-only streams separately, so audio
+    # extraction and transcription start while the video is still downloading.
+    split_streams: bool = True
+    # Local files: "link" places them in raw_dir by hardlink, reflink or symlink
+    # (copying only as a last resort), "copy" always copies and "in_place"
+    # processes the original file without touching raw_dir.
+    local_mode: Literal["link", "copy", "in_place"] = "link"
+
+
 class ExtractionConfig(BaseModel):
     """Controls FFmpeg extraction granularity."""
 
     frame_strategy: Literal["scene", "interval"] = "scene"
     frame_interval_seconds: float = 3.0
-    scene_threshold: float = 0.4
+    # "seek" jumps between sample points, decoding only from the keyframe
+    # preceding each one; "ffmpeg" lets ffmpeg's fps filter emit only the
+    # sampled frames (written as JPEGs). "grab" still decodes every frame and
+    # only skips colour conversion of unwanted ones.
+    interval_sampler: Literal["grab", "seek", "ffmpeg"] = "seek"
+    # Downscale sampled frames to at most this width (None keeps source size).
+    frame_max_width: int | None = None
+    # Scene detection compares grayscale thumbnails of scene_analysis_width
+    # pixels, sampled at scene_sample_fps. A frame's change score against the
+    # current slide is the larger of its histogram change and its weighted edge
+    # change, both in [0, 1]; a new slide starts when it exceeds scene_threshold,
+    # at most once per scene_min_gap_seconds.
+    scene_threshold: float = 0.15
+    scene_sample_fps: float = 2.0
+    scene_analysis_width: int = 160
+    scene_edge_weight: float = 1.0
+    scene_min_gap_seconds: float = 2.0
     audio_sample_rate: int = 16000
+    # Write the audio track to audio.wav; otherwise PCM is piped from ffmpeg
+    # straight into memory and handed to Whisper as an array.
+    keep_audio_wav: bool = False
+    # Keep decoded frames as NumPy arrays instead of writing JPEGs; they are
+    # encoded once, when the PDFs are rendered. Applies to the OpenCV samplers
+    # and to scene detection.
+    in_memory_frames: bool = False
+    # Collapse runs of near-identical frames into one slide before OCR.
+    dedup_frames: bool = True
+    dedup_hash_size: int = 8
+    dedup_max_hamming: int = 6
+    dedup_max_pixel_diff: float = 0.03
 
 
 class ModelConfig(BaseModel):
@@ -52,11 +103,41 @@ class ModelConfig(BaseModel):
 
     whisper_model: str = "medium"
     whisper_language: str | None = None
+    # Word-level timestamps let transcript text be split exactly at slide changes.
+    whisper_word_timestamps: bool = True
+    # >1 splits the audio at silences and transcribes chunks in a process pool,
+    # each worker holding its own model instance.
+    whisper_workers: int = 1
+    whisper_cpu_threads: int = 0  # per worker; 0 lets CTranslate2 decide
+    whisper_chunk_seconds: float = 300.0
+    whisper_chunk_overlap_seconds: float = 1.0
     # Default to no VLM captions to keep GPU/CPU requirements modest.
     # Override via env: MODELS__vlm_model="Salesforce/blip-image-captioning-base" (or similar).
     vlm_model: str = "none"
+    caption_batch_size: int = 4
+    caption_max_new_tokens: int = 128
+    # Slides whose OCR text is already this long are not captioned (None captions all).
+    caption_skip_ocr_chars: int | None = 400
     ocr_lang: str = "en"
+    ocr_min_score: float = 0.7
+    # Frames per OCR call, and number of PaddleOCR instances working in parallel.
+    ocr_batch_size: int = 8
+    ocr_workers: int = 1
+    # OCR only the band of rows that changed since the previous slide (e.g. a
+    # newly revealed bullet) and merge it with that slide's lines; frames whose
+    # band is taller than ocr_region_max_fraction of the frame get full OCR.
+    ocr_incremental: bool = True
+    ocr_region_max_fraction: float = 0.5
+    # Grayscale difference (0-255) above which a pixel counts as changed.
+    ocr_diff_threshold: int = 32
+    # Fixed overlay such as a webcam inset, as (x, y, width, height) fractions
+    # of the frame: changes there are ignored and text centered in it dropped.
+    ocr_ignore_region: tuple[float, float, float, float] | None = None
     device: str = "cuda"
+    # Models load on first use and are unloaded after this many idle seconds
+    # (None keeps them resident) or when resident models exceed the budget.
+    idle_unload_seconds: float | None = 900.0
+    memory_budget_mb: int | None = None
 
 
 class PdfConfig(BaseModel):
@@ -67,15 +148,86 @@ class PdfConfig(BaseModel):
     margin: int = 24
     font_name: str = "Helvetica"
     font_size: int = 12
+    # Slide images are downscaled to this resolution for the box they are drawn
+    # in (None keeps the frame resolution) and re-encoded as JPEG.
+    image_dpi: int | None = 150
+    jpeg_quality: int = 80
+    # Per-PDF size budget; images are shrunk further until the file fits.
+    max_file_bytes: int | None = None
+    # "canvas" merges segments into timestamped paragraphs and lays them out
+    # directly; "platypus" renders one flowable per segment.
+    transcript_engine: Literal["canvas", "platypus"] = "canvas"
+    transcript_paragraph_seconds: float = 30.0
+
+
+class CacheConfig(BaseModel):
+    """Content-addressed cache of stage outputs (frames, OCR, transcripts)."""
+
+    enabled: bool = True
+    max_bytes: int = 20 * 1024**3
+
+
+class PipelineConfig(BaseModel):
+    """Scheduling of pipeline stages."""
+
+    # Run independent stages (audio vs. visual branch, the three PDFs) concurrently.
+    concurrent_stages: bool = True
+    max_workers: int = 4
+    # Add each processed video to the full-text search index.
+    update_search_index: bool = True
+    # Add its chunked slides and transcript to the local vector index.
+    update_vector_index: bool = True
+
+
+class VectorConfig(BaseModel):
+    """Chunked embeddings for semantic search and retrieval."""
+
+    # "hashing" needs no model or network; "hf:<model>" embeds with a
+    # sentence-transformers model through LangChain. Changing it requires
+    # re-indexing, as vectors of different embedders are not comparable.
+    embedder: str = "hashing"
+    hashing_dim: int = 1024
+    # Transcript pieces of one slide are merged into chunks of at most this span.
+    chunk_seconds: float = 60.0
+
+
+class JobQueueConfig(BaseModel):
+    """Background job processing for the API server."""
+
+    workers: int = 1
+    poll_seconds: float = 1.0
+    # A running job is held under a lease its worker renews every third of
+    # lease_seconds; once expired (the process died or hung) the job is
+    # requeued, and failed after max_attempts claims.
+    lease_seconds: float = 60.0
+    max_attempts: int = 3
+
+
+class BatchConfig(BaseModel):
+    """Concurrency of `vlsp batch`, which processes many lectures in one process."""
+
+    concurrent_videos: int = 2
+    # Limits on stages running at once across all lectures of a batch
+    # (0 disables a limit); models stay loaded between lectures.
+    download_limit: int = 2
+    ffmpeg_limit: int = 2
+    ocr_limit: int = 1
+    whisper_limit: int = 1
 
 
 class Settings(BaseSettings):
     """Top-level settings loaded from env vars."""
 
     paths: StoragePaths = Field(default_factory=StoragePaths)
+    ingest: IngestConfig = Field(default_factory=IngestConfig)
     extract: ExtractionConfig = Field(default_factory=ExtractionConfig)
     models: ModelConfig = Field(default_factory=ModelConfig)
     pdf: PdfConfig = Field(default_factory=PdfConfig)
+    pipeline: PipelineConfig = Field(default_factory=PipelineConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    vectors: VectorConfig = Field(default_factory=VectorConfig)
+    jobs: JobQueueConfig = Field(default_factory=JobQueueConfig)
+    batch: BatchConfig = Field(default_factory=BatchConfig)
 
     yt_downloader: str = "yt-dlp"
     ffmpeg_binary: str = "ffmpeg"
@@ -0,0 +1,104 @@
+"""Perceptual-hash deduplication of extracted frames."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Sequence
+
+import cv2
+import numpy as np
+from rich.console import Console
+
+from .config import ExtractionConfig, Settings, resolve_settings
+from .media import FrameInfo, write_frame_metadata
+
+console = Console()
+
+# Side length of the grayscale thumbnail used for the pixel-difference score.
+_THUMB_SIZE = 32
+
+
+class FrameDeduplicator:
+    """Collapse runs of visually identical frames into one slide with a time span."""
+
+    def __init__(self, settings: Settings | None = None) -> None:
+        self.settings = settings or resolve_settings()
+        self.extract_cfg: ExtractionConfig = self.settings.extract
+
+    def deduplicate(
+        self, frames: Sequence[FrameInfo], meta_path: Path | None = None
+    ) -> List[FrameInfo]:
+        if len(frames) < 2:
+            return list(frames)
+
+        thumbs = np.stack([self._thumbnail(f) for f in frames])
+        hashes = dhash(thumbs, self.extract_cfg.dedup_hash_size)
+
+        runs: List[List[int]] = [[0]]
+        for idx in range(1, len(frames)):
+            anchor = runs[-1][0]
+            distance = int(np.count_nonzero(hashes[idx] != hashes[anchor]))
+            pixel_diff = float(np.mean(np.abs(thumbs[idx] - thumbs[anchor])))
+            if (
+                distance <= self.extract_cfg.dedup_max_hamming
+                and pixel_diff <= self.extract_cfg.dedup_max_pixel_diff
+            ):
+                runs[-1].append(idx)
+            else:
+                runs.append([idx])
+
+        slides: List[FrameInfo] = []
+        for run_idx, run in enumerate(runs):
+            # The last frame of a run carries the most revealed content.
+            representative = frames[run[-1]]
+            if run_idx + 1 < len(runs):
+                end = frames[runs[run_idx + 1][0]].timestamp
+            else:
+                end = frames[run[-1]].end or frames[run[-1]].timestamp
+            slides.append(
+                FrameInfo(
+                    index=run_idx,
+                    timestamp=frames[run[0]].timestamp,
+                    path=representative.path,
+                    end=end,
+                    image=representative.image,
+                )
+            )
+
+        console.log(f"[cyan]Deduplicated frames[/] {len(frames)} -> {len(slides)} slides")
+        if meta_path is not None:
+            meta_path.parent.mkdir(parents=True, exist_ok=True)
+            write_frame_metadata(meta_path, slides)
+        return slides
+
+    @staticmethod
+    def _thumbnail(frame: FrameInfo) -> np.ndarray:
+        if frame.image is not None:
+            image = cv2.cvtColor(frame.image, cv2.COLOR_BGR2GRAY)
+        else:
+            # Reduced decoding lets libjpeg skip most of the IDCT work.
+            image = cv2.imread(str(frame.path), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+        if image is None:
+            msg = f"Unable to read frame: {frame.path}"
+            raise FileNotFoundError(msg)
+        thumb = cv2.resize(image, (_THUMB_SIZE, _THUMB_SIZE), interpolation=cv2.INTER_AREA)
+        return thumb.astype(np.float32) / 255.0
+
+
+def dhash(thumbs: np.ndarray, hash_size: int = 8) -> np.ndarray:
+    """Difference hash for a stack of grayscale thumbnails, shape ``(N, H, W)``.
+
+    Returns a boolean array of shape ``(N, hash_size * hash_size)``.
+    """
+    n, h, w = thumbs.shape
+    # Area-average down to (hash_size, hash_size + 1) cells, vectorized over N.
+    rows = np.linspace(0, h, hash_size + 1).astype(int)
+    cols = np.linspace(0, w, hash_size + 2).astype(int)
+    row_sums = np.add.reduceat(thumbs, rows[:-1], axis=1)
+    cells = np.add.reduceat(row_sums, cols[:-1], axis=2)
+    cells /= np.outer(np.diff(rows), np.diff(cols))
+    bits = cells[:, :, 1:] > cells[:, :, :-1]
+    return bits.reshape(n, -1)
+
+
+__all__ = ["FrameDeduplicator", "dhash"]
@@ -3,14 +3,17 @@
 from __future__ import annotations
 
 import shutil
-import subprocess
+import time
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Literal
 
 from rich.console import Console
 
+from .cache import file_digest, place_file
 from .config import IngestRequest, Settings, resolve_settings
+from .metrics import run_process
 
 console = Console()
 
@@ -23,6 +26,10 @@ class IngestResult:
     source: str
     source_type: str
     video_path: Path
+    content_hash: str | None = None
+    # How the file got to ``video_path`` and the wall time ingestion took.
+    method: str = ""
+    seconds: float = 0.0
 
 
 class VideoIngestor:
@@ -33,54 +40,88 @@ class VideoIngestor:
 
     def ingest(self, req: IngestRequest) -> IngestResult:
         console.log(f"[bold green]Ingesting source[/]: {req.source_type} -> {req.source}")
+        start = time.perf_counter()
         if req.source_type == "local":
-            return self._copy_local(Path(req.source))
-        if req.source_type == "youtube":
-            return self._download_youtube(req.source)
-        if req.source_type == "gdrive":
-            return self._download_gdrive(req.source)
-        msg = f"Unsupported source type {req.source_type}"
-        raise ValueError(msg)
+            result = self._place_local(Path(req.source))
+        elif req.source_type == "youtube":
+            result = self._download_youtube(req.source)
+        elif req.source_type == "gdrive":
+            result = self._download_gdrive(req.source)
+        else:
+            msg = f"Unsupported source type {req.source_type}"
+            raise ValueError(msg)
+        result.seconds = time.perf_counter() - start
+        console.log(f"[cyan]Ingested[/] {result.video_id} ({result.method}) in {result.seconds:.2f}s")
+        return result
+
+    def splits_streams(self, req: IngestRequest) -> bool:
+        """Whether ``req`` is fetched as separate audio and video streams."""
+        return req.source_type == "youtube" and self.settings.ingest.split_streams
+
+    def allocate(self) -> tuple[str, Path]:
+        """Create a fresh raw directory for a downloaded source."""
+        video_id = uuid.uuid4().hex[:8]
+        destination = self.settings.paths.raw_dir / video_id
+        destination.mkdir(parents=True, exist_ok=True)
+        return video_id, destination
+
+    def download_stream(
+        self, url: str, destination: Path, kind: Literal["audio", "video"]
+    ) -> Path:
+        """Fetch only the audio or only the video stream of ``url`` into ``destination``."""
+        fmt = "bestaudio/best" if kind == "audio" else "bestvideo/best"
+        cmd = self._yt_dlp_command(url, str(destination / f"{kind}.%(ext)s"), fmt)
+        console.log(f"[cyan]yt-dlp[/] {kind} stream {url}")
+        run_process(cmd)
+        files = [p for p in destination.glob(f"{kind}.*") if p.suffix not in (".part", ".ytdl")]
+        if not files:
+            msg = f"Failed to download {kind} stream via yt-dlp"
+            raise RuntimeError(msg)
+        return files[0]
 
     # region helpers
-    def _copy_local(self, src: Path) -> IngestResult:
+    def _yt_dlp_command(self, url: str, output_template: str, fmt: str) -> list[str]:
+        cmd = [self.settings.yt_downloader, url, "-o", output_template, "-f", fmt]
+        if self.settings.youtube_cookie_file:
+            cmd += ["--cookies", str(self.settings.youtube_cookie_file)]
+        return cmd
+
+    def _place_local(self, src: Path) -> IngestResult:
         if not src.exists():
             msg = f"Local file not found: {src}"
             raise FileNotFoundError(msg)
-        video_id = src.stem
+        # Key by content so different files sharing a name do not collide.
+        content_hash = file_digest(src)
+        video_id = f"{src.stem}-{content_hash[:8]}"
+        mode = self.settings.ingest.local_mode
+        if mode == "in_place":
+            return IngestResult(video_id, str(src), "local", src, content_hash, "in_place")
         destination = self.settings.paths.raw_dir / video_id
         destination.mkdir(parents=True, exist_ok=True)
         target = destination / src.name
-        shutil.copy2(src, target)
-        return IngestResult(video_id, str(src), "local", target)
+        if target.exists() and target.stat().st_size == src.stat().st_size:
+            # The id carries the content hash, so this is the same video from an earlier run.
+            method = "existing"
+        elif mode == "copy":
+            shutil.copy2(src, target)
+            method = "copy"
+        else:
+            method = place_file(src, target, allow_symlink=True)
+        return IngestResult(video_id, str(src), "local", target, content_hash, method)
 
     def _download_youtube(self, url: str) -> IngestResult:
-        video_id = uuid.uuid4().hex[:8]
-        destination = self.settings.paths.raw_dir / video_id
-        destination.mkdir(parents=True, exist_ok=True)
-
+        video_id, destination = self.allocate()
         output_template = str(destination / "%(title)s.%(ext)s")
-        cmd = [
-            self.settings.yt_downloader,
-            url,
-            "-o",
-            output_template,
-            "-f",
-            "bestvideo+bestaudio/best",
-            "--merge-output-format",
-            "mp4",
-        ]
-        if self.settings.youtube_cookie_file:
-            cmd += ["--cookies", str(self.settings.youtube_cookie_file)]
-
+        cmd = self._yt_dlp_command(url, output_template, "bestvideo+bestaudio/best")
+        cmd += ["--merge-output-format", "mp4"]
         console.log(f"[cyan]yt-dlp[/] {' '.join(cmd)}")
-        subprocess.run(cmd, check=True)
+        run_process(cmd)
 
         files = list(destination.glob("*.mp4"))
         if not files:
             msg = "Failed to download video via yt-dlp"
             raise RuntimeError(msg)
-        return IngestResult(video_id, url, "youtube", files[0])
+        return IngestResult(video_id, url, "youtube", files[0], method="yt-dlp")
 
     def _download_gdrive(self, drive_url: str) -> IngestResult:
         try:
@@ -90,9 +131,7 @@ class VideoIngestor:
                 "gdown not available; install extras or add gdown dependency."
             ) from exc
 
-        video_id = uuid.uuid4().hex[:8]
-        destination = self.settings.paths.raw_dir / video_id
-        destination.mkdir(parents=True, exist_ok=True)
+        video_id, destination = self.allocate()
         output = destination / "drive_video.mp4"
 
         console.log(f"[cyan]gdown[/] downloading {drive_url}")
@@ -101,7 +140,7 @@ class VideoIngestor:
         if not output.exists():
             msg = "Google Drive download failed"
             raise RuntimeError(msg)
-        return IngestResult(video_id, drive_url, "gdrive", output)
+        return IngestResult(video_id, drive_url, "gdrive", output, method="gdown")
 
 
 __all__ = ["VideoIngestor", "IngestResult", "IngestRequest"]
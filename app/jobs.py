@@ -0,0 +1,358 @@
+"""Persistent background job queue for pipeline runs."""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from rich.console import Console
+
+from .config import IngestRequest, JobQueueConfig, Settings, resolve_settings
+from .pipeline import PipelineCancelled, PipelineResult, PipelineRunner
+
+console = Console()
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    stages TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+# Columns added after the first release, for job databases created before them.
+_ADDED_COLUMNS = {
+    "owner": "TEXT",
+    "lease_expires": "REAL",
+    "attempts": "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+@dataclass
+class Job:
+    """Snapshot of a queued or finished pipeline run."""
+
+    id: str
+    status: str
+    request: Dict[str, Any]
+    stages: Dict[str, str] = field(default_factory=dict)
+    result: Dict[str, Any] | None = None
+    error: str | None = None
+    cancel_requested: bool = False
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    attempts: int = 0
+
+
+class JobStore:
+    """SQLite-backed job table; safe to share between threads and processes.
+
+    Claimed jobs are leased to an owner (one per :class:`JobQueue`), which must
+    renew the lease while it runs the job; jobs whose lease expired are
+    requeued, so a restarted worker never takes over a job another process is
+    still running.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for name, definition in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit mode; multi-statement updates use explicit BEGIN IMMEDIATE.
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def submit(self, request: IngestRequest) -> Job:
+        now = time.time()
+        job = Job(uuid.uuid4().hex, "queued", request.model_dump(), created_at=now, updated_at=now)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, request, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.status, json.dumps(job.request), now, now),
+            )
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def recent(self, limit: int = 50) -> List[Job]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each status."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {status: 0 for status in JOB_STATUSES} | {row["status"]: row["n"] for row in rows}
+
+    def claim_next(self, owner: str, lease_seconds: float, max_attempts: int) -> Job | None:
+        """Atomically lease the oldest queued job to ``owner`` and return it.
+
+        Expired leases are released first: their jobs are requeued, or failed
+        once they have been claimed ``max_attempts`` times.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._release_expired(conn, max_attempts)
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (owner, now + lease_seconds, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        job = self._to_job(row)
+        job.status = "running"
+        job.attempts += 1
+        return job
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Extend ``owner``'s lease on a running job; False once it was lost."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ? "
+                "WHERE id = ? AND owner = ? AND status = 'running'",
+                (time.time() + lease_seconds, job_id, owner),
+            )
+        return cursor.rowcount > 0
+
+    def release_expired(self, max_attempts: int) -> int:
+        """Requeue (or fail) running jobs whose lease expired; returns how many."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            released = self._release_expired(conn, max_attempts)
+            conn.execute("COMMIT")
+        return released
+
+    def set_stage(self, job_id: str, stage: str, state: str) -> None:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            stages = json.loads(row["stages"]) if row else {}
+            stages[stage] = state
+            conn.execute(
+                "UPDATE jobs SET stages = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(stages), time.time(), job_id),
+            )
+            conn.execute("COMMIT")
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Dict[str, Any] | None = None,
+        error: str | None = None,
+        owner: str | None = None,
+    ) -> bool:
+        """Record the outcome; with ``owner``, only while that owner still holds the job."""
+        query = (
+            "UPDATE jobs SET status = ?, result = ?, error = ?, owner = NULL, "
+            "lease_expires = NULL, updated_at = ? WHERE id = ?"
+        )
+        params: List[Any] = [
+            status,
+            json.dumps(result) if result else None,
+            error,
+            time.time(),
+            job_id,
+        ]
+        if owner is not None:
+            query += " AND owner = ? AND status = 'running'"
+            params.append(owner)
+        with self._connect() as conn:
+            cursor = conn.execute(query, params)
+        return cursor.rowcount > 0
+
+    def request_cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued job outright, or flag a running one to stop between stages."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', updated_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ? "
+                "WHERE id = ? AND status = 'running'",
+                (time.time(), job_id),
+            )
+        return self.get(job_id)
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    @staticmethod
+    def _release_expired(conn: sqlite3.Connection, max_attempts: int) -> int:
+        # Runs inside the caller's transaction. Jobs without a lease were left
+        # running by a version that did not record one.
+        now = time.time()
+        expired = "status = 'running' AND (lease_expires IS NULL OR lease_expires < ?)"
+        error = f"Worker stopped responding {max_attempts} time(s); giving up"
+        failed = conn.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, owner = NULL, lease_expires = NULL, "
+            f"updated_at = ? WHERE {expired} AND attempts >= ?",
+            (error, now, now, max_attempts),
+        ).rowcount
+        requeued = conn.execute(
+            "UPDATE jobs SET status = 'queued', stages = '{}', owner = NULL, "
+            f"lease_expires = NULL, updated_at = ? WHERE {expired}",
+            (now, now),
+        ).rowcount
+        if failed or requeued:
+            console.log(f"[yellow]Expired job leases:[/] {requeued} requeued, {failed} failed")
+        return failed + requeued
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"],
+            status=row["status"],
+            request=json.loads(row["request"]),
+            stages=json.loads(row["stages"]),
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            cancel_requested=bool(row["cancel_requested"]),
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            attempts=row["attempts"],
+        )
+
+
+class JobQueue:
+    """Bounded pool of worker threads draining a :class:`JobStore`."""
+
+    def __init__(self, runner: PipelineRunner, settings: Settings | None = None) -> None:
+        self.settings = settings or resolve_settings()
+        self.cfg: JobQueueConfig = self.settings.jobs
+        self.runner = runner
+        self.store = JobStore(self.settings.paths.jobs_db)
+        # Identifies this queue's leases among all processes sharing the store.
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        # Jobs of a crashed process are requeued once their lease runs out.
+        self.store.release_expired(self.cfg.max_attempts)
+        for idx in range(max(self.cfg.workers, 1)):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{idx}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def submit(self, request: IngestRequest) -> Job:
+        job = self.store.submit(request)
+        self._wakeup.set()
+        return job
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            job = self.store.claim_next(self.owner, self.cfg.lease_seconds, self.cfg.max_attempts)
+            if job is None:
+                # Also poll, so jobs submitted by other processes get picked up.
+                self._wakeup.wait(self.cfg.poll_seconds)
+                self._wakeup.clear()
+                continue
+            self._execute(job)
+
+    def _execute(self, job: Job) -> None:
+        console.log(f"[bold green]Starting job[/] {job.id} (attempt {job.attempts})")
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._renew_lease, args=(job.id, done), name=f"job-lease-{job.id}", daemon=True
+        )
+        heartbeat.start()
+        try:
+            result = self.runner.run(
+                IngestRequest(**job.request),
+                on_progress=lambda stage, state: self.store.set_stage(job.id, stage, state),
+                should_cancel=lambda: self.store.is_cancel_requested(job.id),
+            )
+        except PipelineCancelled:
+            self._finish(job.id, "cancelled")
+            console.log(f"[yellow]Cancelled job[/] {job.id}")
+        except Exception as exc:  # pragma: no cover - failures are recorded on the job
+            self._finish(job.id, "failed", error=str(exc))
+            console.log(f"[bold red]Job failed[/] {job.id}: {exc}")
+        else:
+            self._finish(job.id, "succeeded", result=_result_payload(result))
+        finally:
+            done.set()
+            heartbeat.join()
+
+    def _renew_lease(self, job_id: str, done: threading.Event) -> None:
+        while not done.wait(self.cfg.lease_seconds / 3):
+            if not self.store.renew_lease(job_id, self.owner, self.cfg.lease_seconds):
+                console.log(f"[bold red]Lost the lease on job[/] {job_id}")
+                return
+
+    def _finish(self, job_id: str, status: str, **outcome: Any) -> None:
+        if not self.store.finish(job_id, status, owner=self.owner, **outcome):
+            console.log(f"[yellow]Job {job_id} was reclaimed; not recording {status}[/]")
+
+
+def _result_payload(result: PipelineResult) -> Dict[str, Any]:
+    return {
+        "video_id": result.video_id,
+        "slide_pdf": str(result.slide_pdf),
+        "transcript_pdf": str(result.transcript_pdf),
+        "combined_pdf": str(result.combined_pdf),
+        "metrics": {name: m.to_dict() for name, m in result.metrics.items()},
+    }
+
+
+__all__ = ["Job", "JobQueue", "JobStore", "JOB_STATUSES"]
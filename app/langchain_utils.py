@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
-from typing import Iterable, List
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterable, Iterator, List, Sequence
 
 from langchain.schema import Document
 
 from .models.audio import TranscriptSegment
 from .models.vision import SlideTextBlock
+from .vectors import TextChunk, iter_chunks
 
 
 def transcript_to_documents(segments: Iterable[TranscriptSegment]) -> List[Document]:
@@ -32,3 +35,28 @@ def slides_to_documents(slides: Iterable[SlideTextBlock]) -> List[Document]:
         docs.append(Document(page_content=text, metadata=metadata))
     return docs
 
+
+def chunks_to_documents(chunks: Iterable[TextChunk]) -> Iterator[Document]:
+    """Lazily wrap chunks as documents; everything but the text goes to metadata."""
+    for chunk in chunks:
+        metadata = asdict(chunk)
+        text = metadata.pop("text")
+        metadata["type"] = metadata.pop("kind")
+        yield Document(page_content=text, metadata=metadata)
+
+
+def iter_chunk_documents(
+    video_id: str,
+    slides: Sequence[SlideTextBlock],
+    grouped_transcript: Sequence[List[TranscriptSegment]],
+    slide_pdf: Path,
+    combined_pdf: Path,
+    window_seconds: float = 60.0,
+) -> Iterator[Document]:
+    """Slides and slide-aligned transcript windows as a stream of documents.
+
+    ``grouped_transcript`` is the output of :func:`app.sync.align_transcript`.
+    """
+    return chunks_to_documents(
+        iter_chunks(video_id, slides, grouped_transcript, slide_pdf, combined_pdf, window_seconds)
+    )
@@ -4,7 +4,8 @@ from __future__ import annotations
 
 import json
 import subprocess
-from dataclasses import dataclass
+import tempfile
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Iterable, List
 
@@ -13,6 +14,10 @@ import numpy as np
 from rich.progress import track
 
 from .config import ExtractionConfig, Settings, resolve_settings
+from .metrics import run_process, wait_process
+from .scene import SceneDetector, write_scene_scores
+
+_PIPE_CHUNK = 1 << 20
 
 
 @dataclass
@@ -22,6 +27,20 @@ class FrameInfo:
     index: int
     timestamp: float
     path: Path
+    end: float | None = None
+    # Decoded BGR frame when running with in-memory frames; ``path`` is then
+    # only a stable identifier and is never written.
+    image: np.ndarray | None = field(default=None, repr=False, compare=False)
+
+    def load(self) -> np.ndarray:
+        """Return the decoded frame, reading it from disk if necessary."""
+        if self.image is not None:
+            return self.image
+        image = cv2.imread(str(self.path))
+        if image is None:
+            msg = f"Unable to read frame: {self.path}"
+            raise FileNotFoundError(msg)
+        return image
 
 
 class MediaExtractor:
@@ -47,9 +66,42 @@ class MediaExtractor:
             "1",
             str(audio_path),
         ]
-        subprocess.run(cmd, check=True)
+        run_process(cmd)
         return audio_path
 
+    def decode_audio(self, video: Path, sample_rate: int) -> np.ndarray:
+        """Decode the audio track to mono float32 samples piped from ffmpeg's stdout."""
+        cmd = [
+            self.settings.ffmpeg_binary,
+            "-loglevel",
+            "error",
+            "-i",
+            str(video),
+            "-vn",
+            "-f",
+            "f32le",
+            "-acodec",
+            "pcm_f32le",
+            "-ar",
+            str(sample_rate),
+            "-ac",
+            "1",
+            "pipe:1",
+        ]
+        # stderr goes to a file so a chatty ffmpeg cannot block on a full pipe.
+        with tempfile.TemporaryFile() as errors:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errors)
+            assert process.stdout is not None
+            # A growing bytearray avoids holding the chunks and their joined copy at once.
+            buffer = bytearray()
+            while chunk := process.stdout.read(_PIPE_CHUNK):
+                buffer.extend(chunk)
+            if wait_process(process) != 0:
+                errors.seek(0)
+                raise subprocess.CalledProcessError(process.returncode, cmd, stderr=errors.read())
+        usable = len(buffer) - len(buffer) % 4
+        return np.frombuffer(buffer, dtype=np.float32, count=usable // 4)
+
     def extract_frames(self, video: Path, output_dir: Path) -> List[FrameInfo]:
         output_dir.mkdir(parents=True, exist_ok=True)
         metadata_path = output_dir / "frames.json"
@@ -60,69 +112,137 @@ class MediaExtractor:
 
     # region strategies
     def _extract_interval(self, video: Path, out_dir: Path, meta_path: Path) -> List[FrameInfo]:
+        if self.extract_cfg.interval_sampler == "ffmpeg":
+            return self._extract_interval_ffmpeg(video, out_dir, meta_path)
+        if self.extract_cfg.interval_sampler == "seek":
+            return self._extract_interval_seek(video, out_dir, meta_path)
+
         cap = cv2.VideoCapture(str(video))
         fps = cap.get(cv2.CAP_PROP_FPS) or 25
-        interval_frames = int(self.extract_cfg.frame_interval_seconds * fps)
+        interval_frames = max(int(self.extract_cfg.frame_interval_seconds * fps), 1)
         frame_infos: List[FrameInfo] = []
         idx = 0
         saved = 0
-        while True:
-            success, frame = cap.read()
-            if not success:
-                break
-            if idx % max(interval_frames, 1) == 0:
+        # grab() still demuxes and decodes every frame; only retrieve() (colour
+        # conversion and copy into a NumPy array) is limited to sampled frames.
+        while cap.grab():
+            if idx % interval_frames == 0:
+                success, frame = cap.retrieve()
+                if not success:
+                    break
                 timestamp = idx / fps
                 path = out_dir / f"frame_{saved:05d}.jpg"
-                cv2.imwrite(str(path), frame)
-                frame_infos.append(FrameInfo(saved, float(timestamp), path))
+                frame_infos.append(self._store(saved, float(timestamp), path, frame))
                 saved += 1
             idx += 1
         cap.release()
         self._write_metadata(meta_path, frame_infos)
         return frame_infos
 
-    def _extract_scene(self, video: Path, out_dir: Path, meta_path: Path) -> List[FrameInfo]:
-        # Use ffmpeg scene detection filtering
-        scene_dir = out_dir / "scene_frames"
-        scene_dir.mkdir(parents=True, exist_ok=True)
-        scene_pattern = str(scene_dir / "scene_%04d.jpg")
+    def _extract_interval_seek(self, video: Path, out_dir: Path, meta_path: Path) -> List[FrameInfo]:
+        cap = cv2.VideoCapture(str(video))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        interval_frames = max(int(self.extract_cfg.frame_interval_seconds * fps), 1)
+        frame_infos: List[FrameInfo] = []
+        target = 0
+        while not total or target < total:
+            # Seeking lands on the preceding keyframe and decodes forward from
+            # there, so frames between sample points are mostly never decoded.
+            cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+            success, frame = cap.read()
+            if not success:
+                break
+            saved = len(frame_infos)
+            path = out_dir / f"frame_{saved:05d}.jpg"
+            frame_infos.append(self._store(saved, float(target / fps), path, frame))
+            target += interval_frames
+        cap.release()
+        self._write_metadata(meta_path, frame_infos)
+        return frame_infos
+
+    def _extract_interval_ffmpeg(
+        self, video: Path, out_dir: Path, meta_path: Path
+    ) -> List[FrameInfo]:
+        interval = self.extract_cfg.frame_interval_seconds
+        filters = [f"fps=1/{interval}"]
+        if self.extract_cfg.frame_max_width:
+            filters.append(f"scale='min({self.extract_cfg.frame_max_width},iw)':-2")
+        for stale in out_dir.glob("frame_*.jpg"):
+            stale.unlink()
         cmd = [
             self.settings.ffmpeg_binary,
+            "-loglevel",
+            "error",
             "-i",
             str(video),
             "-vf",
-            f"select='gt(scene,{self.extract_cfg.scene_threshold})',showinfo",
+            ",".join(filters),
             "-vsync",
             "vfr",
-            scene_pattern,
+            "-q:v",
+            "2",
+            "-start_number",
+            "0",
+            str(out_dir / "frame_%05d.jpg"),
+        ]
+        run_process(cmd)
+        # The fps filter emits output frame n at n / fps seconds.
+        frame_infos = [
+            FrameInfo(idx, idx * interval, path)
+            for idx, path in enumerate(sorted(out_dir.glob("frame_*.jpg")))
         ]
-        process = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        frame_infos = self._parse_scene_log(process.stderr, scene_dir)
         self._write_metadata(meta_path, frame_infos)
         return frame_infos
 
-    # endregion
-    def _parse_scene_log(self, stderr: str, frame_dir: Path) -> List[FrameInfo]:
+    def _extract_scene(self, video: Path, out_dir: Path, meta_path: Path) -> List[FrameInfo]:
+        detector = SceneDetector(self.settings)
+        for stale in out_dir.glob("scene_*.jpg"):
+            stale.unlink()
         frame_infos: List[FrameInfo] = []
-        for idx, line in enumerate(stderr.splitlines()):
-            if "pts_time" not in line:
-                continue
-            parts = [p for p in line.split(" ") if "pts_time" in p]
-            if not parts:
-                continue
-            timestamp = float(parts[0].split(":")[1])
-            frame_path = frame_dir / f"scene_{idx:04d}.jpg"
-            if frame_path.exists():
-                frame_infos.append(FrameInfo(idx, timestamp, frame_path))
+        for timestamp, frame in detector.detect(video):
+            saved = len(frame_infos)
+            path = out_dir / f"scene_{saved:05d}.jpg"
+            frame_infos.append(self._store(saved, timestamp, path, frame))
+        write_scene_scores(out_dir / "scene_scores.json", detector.scores)
+        self._write_metadata(meta_path, frame_infos)
         return frame_infos
 
+    # endregion
+    def _store(self, index: int, timestamp: float, path: Path, frame: np.ndarray) -> FrameInfo:
+        frame = self._downscale(frame)
+        if self.extract_cfg.in_memory_frames:
+            return FrameInfo(index, timestamp, path, image=frame)
+        # The old file may be hardlinked into a cache entry; replace it, never overwrite.
+        path.unlink(missing_ok=True)
+        cv2.imwrite(str(path), frame)
+        return FrameInfo(index, timestamp, path)
+
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        max_width = self.extract_cfg.frame_max_width
+        height, width = frame.shape[:2]
+        if not max_width or width <= max_width:
+            return frame
+        scale = max_width / width
+        return cv2.resize(
+            frame, (max_width, round(height * scale)), interpolation=cv2.INTER_AREA
+        )
+
     @staticmethod
     def _write_metadata(path: Path, frames: Iterable[FrameInfo]) -> None:
-        serializable = [
-            {"index": f.index, "timestamp": f.timestamp, "path": str(f.path)} for f in frames
-        ]
-        path.write_text(json.dumps(serializable, indent=2))
+        write_frame_metadata(path, frames)
+
+
+def write_frame_metadata(path: Path, frames: Iterable[FrameInfo]) -> None:
+    """Persist frame metadata as JSON next to the extracted images."""
+    serializable = []
+    for f in frames:
+        entry = {"index": f.index, "timestamp": f.timestamp, "path": str(f.path)}
+        if f.end is not None:
+            entry["end"] = f.end
+        serializable.append(entry)
+    path.write_text(json.dumps(serializable, indent=2))
 
 
-__all__ = ["MediaExtractor", "FrameInfo"]
+__all__ = ["MediaExtractor", "FrameInfo", "write_frame_metadata"]
 
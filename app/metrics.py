@@ -0,0 +1,261 @@
+"""Per-stage resource metrics and their Prometheus exposition."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from .models.registry import current_rss_bytes
+
+
+@dataclass
+class StageMetrics:
+    """Resources used by one pipeline stage.
+
+    ``cpu_seconds`` covers the thread that ran the stage and the subprocesses
+    (ffmpeg, yt-dlp) it waited for through :func:`wait_process`, not worker
+    threads of native inference runtimes.
+    ``peak_rss_bytes`` is the process-wide peak while the stage ran, so stages
+    running concurrently see the same peaks.
+    """
+
+    stage: str
+    wall_seconds: float
+    cpu_seconds: float | None = None
+    peak_rss_bytes: int | None = None
+    items: float | None = None
+    unit: str = "items"
+
+    @property
+    def throughput(self) -> float | None:
+        """Items per wall-clock second."""
+        if self.items is None or self.wall_seconds <= 0:
+            return None
+        return self.items / self.wall_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "throughput": self.throughput}
+
+
+@dataclass(eq=False)
+class _Window:
+    # Identity equality: open windows are removed from the sampler by identity.
+    peak: int
+
+
+class RssSampler:
+    """Poll the process RSS while at least one measurement window is open."""
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self.interval = interval
+        self._windows: List[_Window] = []
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @contextmanager
+    def window(self) -> Iterator[_Window]:
+        """Track the peak RSS from entry to exit in the yielded window's ``peak``."""
+        window = _Window(current_rss_bytes())
+        with self._lock:
+            self._windows.append(window)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+                self._thread.start()
+        try:
+            yield window
+        finally:
+            window.peak = max(window.peak, current_rss_bytes())
+            with self._lock:
+                self._windows.remove(window)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            rss = current_rss_bytes()
+            with self._lock:
+                if not self._windows:
+                    self._thread = None
+                    return
+                for window in self._windows:
+                    window.peak = max(window.peak, rss)
+
+
+_sampler = RssSampler()
+
+
+# Child CPU seconds per stage measured in this thread (innermost last). RUSAGE_CHILDREN
+# is process-wide, so concurrent stages would be charged for each other's ffmpeg.
+_open_stages = threading.local()
+
+
+def wait_process(process: subprocess.Popen) -> int:
+    """Wait for ``process`` and charge its CPU time to the stages measured in this thread.
+
+    Where ``os.wait4`` is unavailable (Windows) the child's CPU time is not counted.
+    """
+    if not hasattr(os, "wait4"):
+        return process.wait()
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    for totals in getattr(_open_stages, "totals", []):
+        totals[0] += usage.ru_utime + usage.ru_stime
+    return process.returncode
+
+
+def run_process(cmd: Sequence[str]) -> None:
+    """``subprocess.run(cmd, check=True)``, charging CPU time like :func:`wait_process`."""
+    process = subprocess.Popen(cmd)
+    try:
+        returncode = wait_process(process)
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+
+@contextmanager
+def measure_stage(name: str, unit: str = "items") -> Iterator[StageMetrics]:
+    """Measure the enclosed block; set ``items`` on the yielded metrics to get throughput."""
+    metrics = StageMetrics(name, 0.0, unit=unit)
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    children = [0.0]
+    if not hasattr(_open_stages, "totals"):
+        _open_stages.totals = []
+    _open_stages.totals.append(children)
+    try:
+        with _sampler.window() as window:
+            yield metrics
+    finally:
+        _open_stages.totals.pop()
+    metrics.wall_seconds = time.perf_counter() - start
+    metrics.cpu_seconds = time.thread_time() - cpu_start + children[0]
+    metrics.peak_rss_bytes = window.peak
+
+
+def write_metrics(path: Path, metrics: Iterable[StageMetrics], **extra: Any) -> Path:
+    """Write stage metrics (and any ``extra`` run-level fields) as JSON."""
+    payload = {**extra, "stages": {m.stage: m.to_dict() for m in metrics}}
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return path
+
+
+# region Prometheus
+_SECONDS_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+# 64 MiB to 32 GiB in powers of two.
+_BYTES_BUCKETS = tuple(float(2**exp * 1024**2) for exp in range(6, 16))
+
+
+class _Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._counts: Dict[str, List[int]] = {}
+        self._sums: Dict[str, float] = {}
+
+    def observe(self, stage: str, value: float) -> None:
+        counts = self._counts.setdefault(stage, [0] * (len(self.buckets) + 1))
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[idx] += 1
+        counts[-1] += 1
+        self._sums[stage] = self._sums.get(stage, 0.0) + value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for stage, counts in sorted(self._counts.items()):
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{stage="{stage}",le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{stage="{stage}",le="+Inf"}} {counts[-1]}')
+            lines.append(f'{self.name}_sum{{stage="{stage}"}} {self._sums[stage]:.6g}')
+            lines.append(f'{self.name}_count{{stage="{stage}"}} {counts[-1]}')
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide aggregates of stage metrics, rendered in Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._wall = _Histogram(
+            "vlsp_stage_wall_seconds", "Wall-clock time per pipeline stage.", _SECONDS_BUCKETS
+        )
+        self._cpu = _Histogram(
+            "vlsp_stage_cpu_seconds", "CPU time per pipeline stage.", _SECONDS_BUCKETS
+        )
+        self._rss = _Histogram(
+            "vlsp_stage_peak_rss_bytes", "Peak process RSS during a stage.", _BYTES_BUCKETS
+        )
+        self._items: Dict[tuple[str, str], float] = {}
+        self._runs = 0
+
+    def observe(self, metrics: Iterable[StageMetrics]) -> None:
+        """Record the stages of one finished pipeline run."""
+        with self._lock:
+            self._runs += 1
+            for m in metrics:
+                self._wall.observe(m.stage, m.wall_seconds)
+                if m.cpu_seconds is not None:
+                    self._cpu.observe(m.stage, m.cpu_seconds)
+                if m.peak_rss_bytes is not None:
+                    self._rss.observe(m.stage, m.peak_rss_bytes)
+                if m.items is not None:
+                    key = (m.stage, m.unit)
+                    self._items[key] = self._items.get(key, 0.0) + m.items
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP vlsp_pipeline_runs_total Pipeline runs completed.",
+                "# TYPE vlsp_pipeline_runs_total counter",
+                f"vlsp_pipeline_runs_total {self._runs}",
+                *self._wall.render(),
+                *self._cpu.render(),
+                *self._rss.render(),
+                "# HELP vlsp_stage_items_total Items processed per stage.",
+                "# TYPE vlsp_stage_items_total counter",
+            ]
+            for (stage, unit), total in sorted(self._items.items()):
+                lines.append(f'vlsp_stage_items_total{{stage="{stage}",unit="{unit}"}} {total:g}')
+        return "\n".join(lines) + "\n"
+
+
+def gauge_lines(name: str, help_text: str, label: str, values: Dict[str, float]) -> List[str]:
+    """Prometheus text lines for a gauge with one sample per ``label`` value."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    lines.extend(f'{name}{{{label}="{key}"}} {value:g}' for key, value in sorted(values.items()))
+    return lines
+
+
+_default_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Return the process-wide registry that pipeline runs report to."""
+    return _default_registry
+
+
+# endregion
+
+
+__all__ = [
+    "StageMetrics",
+    "MetricsRegistry",
+    "RssSampler",
+    "measure_stage",
+    "wait_process",
+    "run_process",
+    "write_metrics",
+    "gauge_lines",
+    "get_metrics_registry",
+]
@@ -1,7 +1,30 @@
-"""Model utilities for transcription and slide understanding."""
+"""Model utilities for transcription and slide understanding.
 
-from .audio import WhisperTranscriber
-from .vision import SlideAnalyzer, SlideTextBlock
+Submodules are imported on first attribute access so that importing the
+package does not pull in the inference stacks.
+"""
 
-__all__ = ["WhisperTranscriber", "SlideAnalyzer", "SlideTextBlock"]
+from __future__ import annotations
 
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "WhisperTranscriber": ".audio",
+    "TranscriptSegment": ".audio",
+    "TranscriptWord": ".audio",
+    "SlideAnalyzer": ".vision",
+    "SlideTextBlock": ".vision",
+    "OcrLine": ".vision",
+    "AnalysisStats": ".vision",
+    "ModelManager": ".registry",
+    "get_model_manager": ".registry",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
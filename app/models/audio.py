@@ -2,17 +2,36 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Sequence
 
-from faster_whisper import WhisperModel
+import numpy as np
 from rich.console import Console
 
 from ..config import ModelConfig, Settings, resolve_settings
+from .registry import ModelManager, current_rss_bytes, get_model_manager
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
 
 console = Console()
 
+# faster-whisper expects 16 kHz mono float32 when given raw samples.
+WHISPER_SAMPLE_RATE = 16000
+
+
+@dataclass
+class TranscriptWord:
+    """One word of a segment with its own timestamps."""
+
+    text: str
+    start: float
+    end: float
+
 
 @dataclass
 class TranscriptSegment:
@@ -21,39 +40,281 @@ class TranscriptSegment:
     text: str
     start: float
     end: float
+    # Word-level timings, when the model produced them.
+    words: List[TranscriptWord] = field(default_factory=list)
+
+
+def _segment(segment: Any, offset: float = 0.0) -> TranscriptSegment:
+    """Convert a faster-whisper segment, shifting its times by ``offset`` seconds."""
+    words = [
+        TranscriptWord(word.word.strip(), float(word.start) + offset, float(word.end) + offset)
+        for word in segment.words or []
+        if word.word.strip()
+    ]
+    return TranscriptSegment(
+        text=segment.text.strip(),
+        start=float(segment.start) + offset,
+        end=float(segment.end) + offset,
+        words=words,
+    )
+
+
+def _load_model(cfg: ModelConfig) -> WhisperModel:
+    from faster_whisper import WhisperModel
+
+    kwargs = {"cpu_threads": cfg.whisper_cpu_threads} if cfg.whisper_cpu_threads else {}
+    return WhisperModel(
+        cfg.whisper_model,
+        device=cfg.device,
+        compute_type="float16" if cfg.device == "cuda" else "int8",
+        **kwargs,
+    )
 
 
 class WhisperTranscriber:
     """Wrapper around faster-whisper with GPU preference."""
 
-    def __init__(self, settings: Settings | None = None) -> None:
+    def __init__(
+        self, settings: Settings | None = None, models: ModelManager | None = None
+    ) -> None:
         self.settings = settings or resolve_settings()
         self.model_cfg: ModelConfig = self.settings.models
+        self.models = models or get_model_manager(self.model_cfg)
+
+    def transcribe(self, audio: Path | np.ndarray) -> List[TranscriptSegment]:
+        return list(self.iter_transcribe(audio))
+
+    def iter_transcribe(self, audio: Path | np.ndarray) -> Iterator[TranscriptSegment]:
+        """Yield segments as they are decoded, so consumers can start early.
+
+        ``audio`` is a media file or mono float32 samples at ``WHISPER_SAMPLE_RATE``.
+        """
+        if self.model_cfg.whisper_workers > 1:
+            yield from self._transcribe_chunked(audio)
+            return
+        cfg = self.model_cfg
+        key = ("whisper", cfg.whisper_model, cfg.device, cfg.whisper_cpu_threads)
+        name = f"whisper:{cfg.whisper_model} ({cfg.device})"
+        # The model stays pinned while the lazy segment generator is consumed.
+        with self.models.acquire(key, name, lambda: _load_model(cfg)) as model:
+            segments, _ = model.transcribe(
+                audio if isinstance(audio, np.ndarray) else str(audio),
+                language=cfg.whisper_language,
+                word_timestamps=cfg.whisper_word_timestamps,
+            )
+            for segment in segments:
+                yield _segment(segment)
+
+    def close(self) -> None:
+        """Shut down the chunk worker pool, if one is resident and idle."""
+        self.models.unload(self._pool_key())
+
+    # region chunked mode
+    def _transcribe_chunked(self, audio: Path | np.ndarray) -> Iterator[TranscriptSegment]:
+        cfg = self.model_cfg
+        if isinstance(audio, np.ndarray):
+            samples = audio
+        else:
+            from faster_whisper import decode_audio
+
+            samples = decode_audio(str(audio), sampling_rate=WHISPER_SAMPLE_RATE)
+        spans = split_on_silence(samples, WHISPER_SAMPLE_RATE, cfg.whisper_chunk_seconds)
+        overlap = int(cfg.whisper_chunk_overlap_seconds * WHISPER_SAMPLE_RATE)
         console.log(
-            f"[bold green]Loading Whisper model[/] {self.model_cfg.whisper_model} on {self.model_cfg.device}"
-        )
-        self.model = WhisperModel(
-            self.model_cfg.whisper_model,
-            device=self.model_cfg.device,
-            compute_type="float16" if self.model_cfg.device == "cuda" else "int8",
+            f"[cyan]Transcribing[/] {len(spans)} chunks with {cfg.whisper_workers} workers"
         )
 
-    def transcribe(self, audio_path: Path) -> List[TranscriptSegment]:
-        segments, _ = self.model.transcribe(
-            str(audio_path),
-            language=self.model_cfg.whisper_language,
-        )
-        parsed: List[TranscriptSegment] = []
-        for segment in segments:
-            parsed.append(
-                TranscriptSegment(
-                    text=segment.text.strip(),
-                    start=float(segment.start),
-                    end=float(segment.end),
+        name = f"whisper:{cfg.whisper_model} x{cfg.whisper_workers} workers ({cfg.device})"
+        # The pool is pinned until every chunk has been stitched.
+        with self.models.acquire(
+            self._pool_key(), name, lambda: _WorkerPool(cfg), lambda pool: pool.shutdown()
+        ) as pool:
+            yield from self._stitch_chunks(pool.executor, samples, spans, overlap)
+
+    def _stitch_chunks(
+        self,
+        pool: ProcessPoolExecutor,
+        samples: np.ndarray,
+        spans: Sequence[tuple[int, int]],
+        overlap: int,
+    ) -> Iterator[TranscriptSegment]:
+        cfg = self.model_cfg
+        futures = []
+        for start, end in spans:
+            # Start each chunk slightly early so words cut at the boundary are
+            # heard in full; the duplicate text is removed when stitching.
+            chunk_start = max(start - overlap, 0)
+            futures.append(
+                pool.submit(
+                    _transcribe_chunk,
+                    samples[chunk_start:end],
+                    chunk_start / WHISPER_SAMPLE_RATE,
+                    cfg.whisper_language,
+                    cfg.whisper_word_timestamps,
                 )
             )
-        return parsed
+        # Chunks finish in any order but are stitched (and yielded) in sequence.
+        yield from iter_stitched(future.result() for future in futures)
+
+    def _pool_key(self) -> tuple:
+        cfg = self.model_cfg
+        return (
+            "whisper-pool",
+            cfg.whisper_model,
+            cfg.device,
+            cfg.whisper_cpu_threads,
+            cfg.whisper_workers,
+        )
+
+    # endregion
+
+
+class _WorkerPool:
+    """Chunk worker processes, each holding its own Whisper model.
+
+    Registered with the model manager as one entry, so idle unloading and the
+    memory budget shut the processes down and ``/models`` reports them.
+    """
+
+    def __init__(self, cfg: ModelConfig) -> None:
+        # Spawn rather than fork: forking a process with loaded native
+        # inference runtimes is not safe.
+        self.executor = ProcessPoolExecutor(
+            max_workers=cfg.whisper_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(cfg,),
+        )
+        # Start every worker now, so the models load (and are measured) while
+        # the manager is loading this entry. Workers hold identical models, so
+        # the mean worker RSS stands in for any worker that reported twice.
+        try:
+            futures = [self.executor.submit(_worker_rss) for _ in range(cfg.whisper_workers)]
+            sizes = [future.result() for future in futures]
+        except BaseException:
+            self.executor.shutdown(cancel_futures=True)
+            raise
+        self.footprint = sum(sizes) // len(sizes) * cfg.whisper_workers
+
+    def get_memory_footprint(self) -> int:
+        return self.footprint
+
+    def shutdown(self) -> None:
+        self.executor.shutdown()
+
+
+_worker_model: WhisperModel | None = None
+
+
+def _init_worker(cfg: ModelConfig) -> None:
+    global _worker_model
+    _worker_model = _load_model(cfg)
+
+
+def _worker_rss() -> int:
+    return current_rss_bytes()
+
+
+def _transcribe_chunk(
+    samples: np.ndarray, offset: float, language: str | None, word_timestamps: bool = False
+) -> List[TranscriptSegment]:
+    assert _worker_model is not None
+    segments, _ = _worker_model.transcribe(
+        samples, language=language, word_timestamps=word_timestamps
+    )
+    return [_segment(segment, offset) for segment in segments]
+
+
+def split_on_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    target_seconds: float,
+    search_seconds: float = 10.0,
+    window_ms: int = 30,
+) -> List[tuple[int, int]]:
+    """Split audio into ~``target_seconds`` spans, cutting at the quietest window
+    within ``search_seconds`` of each target boundary. Returns sample ranges."""
+    total = len(samples)
+    target = int(target_seconds * sample_rate)
+    if total <= target:
+        return [(0, total)]
+
+    window = max(int(sample_rate * window_ms / 1000), 1)
+    n_windows = total // window
+    energy = np.sqrt(
+        np.mean(np.square(samples[: n_windows * window].reshape(n_windows, window)), axis=1)
+    )
+    search = int(search_seconds * sample_rate) // window
+
+    spans: List[tuple[int, int]] = []
+    start = 0
+    while total - start > target:
+        center = (start + target) // window
+        lo = max(center - search, start // window + 1)
+        hi = min(center + search, n_windows)
+        cut = (lo + int(np.argmin(energy[lo:hi]))) * window if hi > lo else start + target
+        spans.append((start, cut))
+        start = cut
+    spans.append((start, total))
+    return spans
+
+
+_WORD = re.compile(r"[^\w']+")
+
+
+def _words(text: str) -> List[str]:
+    return [w for w in _WORD.sub(" ", text.lower()).split() if w]
+
+
+def _strip_overlap(previous: str, text: str, max_words: int = 12) -> str:
+    """Drop leading words of ``text`` that repeat the tail of ``previous``."""
+    prev_words = _words(previous)
+    raw_words = text.split()
+    norm_words = [" ".join(_words(w)) for w in raw_words]
+    for size in range(min(max_words, len(prev_words), len(raw_words)), 0, -1):
+        if prev_words[-size:] == norm_words[:size]:
+            return " ".join(raw_words[size:])
+    return text
+
+
+def iter_stitched(
+    chunks: Iterable[Sequence[TranscriptSegment]],
+) -> Iterator[TranscriptSegment]:
+    """Merge per-chunk segments (already in global time) into one ordered stream."""
+    last: TranscriptSegment | None = None
+    for chunk in chunks:
+        for segment in chunk:
+            if last and segment.end <= last.end:
+                # Entirely inside the overlap the previous chunk already covered.
+                continue
+            if last and segment.start < last.end:
+                start = last.end
+                if segment.words:
+                    # Word timings say which words the previous chunk covered; like
+                    # align_transcript, a word belongs where its midpoint falls.
+                    words = [w for w in segment.words if (w.start + w.end) / 2 >= last.end]
+                    text = " ".join(w.text for w in words)
+                    if words:
+                        start = words[0].start
+                else:
+                    words = []
+                    text = _strip_overlap(last.text, segment.text)
+                if not text:
+                    continue
+                segment = TranscriptSegment(text, start, segment.end, words)
+            last = segment
+            yield segment
+
 
+def stitch_segments(chunks: Sequence[Sequence[TranscriptSegment]]) -> List[TranscriptSegment]:
+    """Merge per-chunk segments (already in global time) into one ordered list."""
+    return list(iter_stitched(chunks))
 
-__all__ = ["WhisperTranscriber", "TranscriptSegment"]
 
+__all__ = [
+    "WhisperTranscriber",
+    "TranscriptSegment",
+    "TranscriptWord",
+    "split_on_silence",
+    "stitch_segments",
+]
@@ -0,0 +1,217 @@
+"""Process-wide model residency: lazy loading, sharing and eviction."""
+
+from __future__ import annotations
+
+import gc
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterator, List
+
+from rich.console import Console
+
+from ..config import ModelConfig
+
+console = Console()
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+@dataclass
+class _Resident:
+    name: str
+    model: Any
+    size_bytes: int
+    loaded_at: float
+    last_used: float
+    in_use: int = 0
+    on_unload: Callable[[Any], None] | None = None
+
+
+class ModelManager:
+    """Load models on first use, share them across runners and unload idle ones.
+
+    Models are keyed by their loading parameters, so two runners with the same
+    configuration share one instance. Entries not in use are unloaded once idle
+    for ``idle_seconds`` or, least recently used first, when the summed resident
+    size exceeds ``memory_budget_bytes``. Sizes are the RSS growth observed while
+    loading (or the model's own footprint when it reports a larger one).
+    Resources that are not plain objects, such as worker processes, pass an
+    ``on_unload`` hook that releases them.
+    """
+
+    def __init__(
+        self, idle_seconds: float | None = None, memory_budget_bytes: int | None = None
+    ) -> None:
+        self.idle_seconds = idle_seconds
+        self.memory_budget_bytes = memory_budget_bytes
+        self._entries: Dict[Hashable, _Resident] = {}
+        self._loading: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.RLock()
+        self._reaper: threading.Thread | None = None
+
+    @contextmanager
+    def acquire(
+        self,
+        key: Hashable,
+        name: str,
+        loader: Callable[[], Any],
+        on_unload: Callable[[Any], None] | None = None,
+    ) -> Iterator[Any]:
+        """Yield the model for ``key``, loading it if needed; it is pinned until exit.
+
+        ``on_unload`` is called with the model when the entry is unloaded.
+        """
+        entry = self._ensure_loaded(key, name, loader, on_unload)
+        try:
+            yield entry.model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.time()
+
+    def unload(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.in_use:
+                return False
+            del self._entries[key]
+        console.log(f"[yellow]Unloaded model[/] {entry.name}")
+        if entry.on_unload is not None:
+            entry.on_unload(entry.model)
+        del entry
+        _release_memory()
+        return True
+
+    def unload_idle(self) -> List[str]:
+        if self.idle_seconds is None:
+            return []
+        cutoff = time.time() - self.idle_seconds
+        with self._lock:
+            stale = [
+                (key, entry.name)
+                for key, entry in self._entries.items()
+                if not entry.in_use and entry.last_used < cutoff
+            ]
+        return [name for key, name in stale if self.unload(key)]
+
+    def report(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "name": entry.name,
+                    "size_bytes": entry.size_bytes,
+                    "in_use": entry.in_use,
+                    "idle_seconds": round(now - entry.last_used, 1),
+                }
+                for entry in self._entries.values()
+            ]
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._entries.values())
+
+    # region helpers
+    def _ensure_loaded(
+        self,
+        key: Hashable,
+        name: str,
+        loader: Callable[[], Any],
+        on_unload: Callable[[Any], None] | None = None,
+    ) -> _Resident:
+        with self._lock:
+            load_lock = self._loading.setdefault(key, threading.Lock())
+        # Per-key lock: concurrent first users wait for a single load.
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.in_use += 1
+                    return entry
+            console.log(f"[bold green]Loading model[/] {name}")
+            before = current_rss_bytes()
+            model = loader()
+            size = max(current_rss_bytes() - before, _reported_footprint(model))
+            now = time.time()
+            entry = _Resident(name, model, size, now, now, in_use=1, on_unload=on_unload)
+            with self._lock:
+                self._entries[key] = entry
+            self._enforce_budget()
+            self._start_reaper()
+            return entry
+
+    def _enforce_budget(self) -> None:
+        if self.memory_budget_bytes is None:
+            return
+        with self._lock:
+            candidates = sorted(
+                (key for key, e in self._entries.items() if not e.in_use),
+                key=lambda k: self._entries[k].last_used,
+            )
+        for key in candidates:
+            if self.resident_bytes() <= self.memory_budget_bytes:
+                break
+            self.unload(key)
+
+    def _start_reaper(self) -> None:
+        if self.idle_seconds is None or self._reaper is not None:
+            return
+        interval = max(min(self.idle_seconds / 2, 60.0), 1.0)
+
+        def reap() -> None:
+            while True:
+                time.sleep(interval)
+                self.unload_idle()
+
+        self._reaper = threading.Thread(target=reap, name="model-reaper", daemon=True)
+        self._reaper.start()
+
+    # endregion
+
+
+def _reported_footprint(model: Any) -> int:
+    if isinstance(model, tuple):
+        return sum(_reported_footprint(part) for part in model)
+    footprint = getattr(model, "get_memory_footprint", None)
+    if callable(footprint):
+        try:
+            return int(footprint())
+        except Exception:  # pragma: no cover - best-effort estimate
+            return 0
+    return 0
+
+
+def _release_memory() -> None:
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+_default_manager: ModelManager | None = None
+_default_lock = threading.Lock()
+
+
+def get_model_manager(cfg: ModelConfig | None = None) -> ModelManager:
+    """Return the process-wide manager, created from ``cfg`` on first call."""
+    global _default_manager
+    with _default_lock:
+        if _default_manager is None:
+            cfg = cfg or ModelConfig()
+            budget = cfg.memory_budget_mb * 1024**2 if cfg.memory_budget_mb else None
+            _default_manager = ModelManager(cfg.idle_unload_seconds, budget)
+        return _default_manager
+
+
+__all__ = ["ModelManager", "get_model_manager", "current_rss_bytes"]
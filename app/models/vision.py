@@ -2,20 +2,44 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import queue
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from itertools import chain, islice
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterator, List, Sequence
 
-from paddleocr import PaddleOCR
+import cv2
+import numpy as np
 from PIL import Image
 from rich.console import Console
-from transformers import AutoProcessor, AutoTokenizer, LlavaForConditionalGeneration
 
 from ..config import ModelConfig, Settings, resolve_settings
+from ..media import FrameInfo
+from .registry import ModelManager, get_model_manager
+
+if TYPE_CHECKING:
+    from paddleocr import PaddleOCR
 
 console = Console()
 
 
+FrameSource = Path | np.ndarray
+# (x0, y0, x1, y1) in frame pixels.
+Box = tuple[float, float, float, float]
+
+
+@dataclass
+class OcrLine:
+    """One recognized text line with its recognition confidence."""
+
+    text: str
+    score: float
+    box: Box | None = None
+
+
 @dataclass
 class SlideTextBlock:
     """Text extracted from a slide frame."""
@@ -24,74 +48,427 @@ class SlideTextBlock:
     timestamp: float
     text: str
     caption: str | None = None
+    end: float | None = None
+    lines: List[OcrLine] = field(default_factory=list)
+    # In-memory frame (BGR) and its JPEG encodings by pixel size, shared by the PDF builders.
+    image: np.ndarray | None = field(default=None, repr=False, compare=False)
+    encoded: Dict[tuple[int, int], bytes] = field(default_factory=dict, repr=False, compare=False)
+
+
+@dataclass
+class AnalysisStats:
+    """Work done by one analyze call; filled in as its slides are produced."""
+
+    # Wall-clock seconds of each caption batch.
+    caption_batch_seconds: List[float] = field(default_factory=list)
+    # Frames OCR'd in full, by changed region only, or not at all ("unchanged").
+    ocr_modes: Counter[str] = field(default_factory=Counter)
+    # Rows OCR'd for the region frames, and those frames' total rows.
+    ocr_region_rows: int = 0
+    ocr_region_frame_rows: int = 0
 
 
 class SlideAnalyzer:
     """Combine OCR (PaddleOCR) with LLaVA captions for richer context."""
 
-    def __init__(self, settings: Settings | None = None) -> None:
+    def __init__(
+        self, settings: Settings | None = None, models: ModelManager | None = None
+    ) -> None:
         self.settings = settings or resolve_settings()
         cfg: ModelConfig = self.settings.models
+        self.models = models or get_model_manager(cfg)
 
-        console.log("[bold green]Loading PaddleOCR[/]")
-        # Newer PaddleOCR uses `device` in common args; `use_gpu`/`show_log` are deprecated.
-        paddle_device = "gpu" if cfg.device == "cuda" else "cpu"
-        self.ocr = PaddleOCR(lang=cfg.ocr_lang, device=paddle_device)
-
-        if cfg.vlm_model.lower() != "none":
-            console.log(f"[bold green]Loading VLM[/] {cfg.vlm_model}")
-            self.processor = AutoProcessor.from_pretrained(cfg.vlm_model)
-            self.tokenizer = AutoTokenizer.from_pretrained(cfg.vlm_model)
-            self.model = LlavaForConditionalGeneration.from_pretrained(
-                cfg.vlm_model, device_map="auto"
-            )
-        else:
+        # Slots for parallel OCR; PaddleOCR instances are not thread-safe, so each
+        # worker checks a slot (and the engine loaded for it) out for a whole batch.
+        self._ocr_slots: queue.Queue = queue.Queue()
+        for slot in range(max(cfg.ocr_workers, 1)):
+            self._ocr_slots.put(slot)
+
+        self.captions_enabled = cfg.vlm_model.lower() != "none"
+        if not self.captions_enabled:
             console.log("[yellow]Skipping VLM captions (vlm_model=none)[/]")
-            self.processor = None
-            self.tokenizer = None
-            self.model = None
-
-    def analyze(self, frames: List[tuple[float, Path]]) -> List[SlideTextBlock]:
-        blocks: List[SlideTextBlock] = []
-        for timestamp, frame_path in frames:
-            text = self._ocr_frame(frame_path)
-            caption = self._caption_frame(frame_path) if self.model else None
-            merged_text = "\n".join(filter(None, [text, caption or ""])).strip()
-            if not merged_text:
-                continue
-            blocks.append(
-                SlideTextBlock(
-                    frame_path=frame_path,
-                    timestamp=timestamp,
+
+    def analyze(
+        self,
+        frames: Sequence[FrameInfo | tuple[float, Path]],
+        stats: AnalysisStats | None = None,
+    ) -> List[SlideTextBlock]:
+        return list(self.iter_analyze(frames, stats))
+
+    def iter_analyze(
+        self,
+        frames: Sequence[FrameInfo | tuple[float, Path]],
+        stats: AnalysisStats | None = None,
+    ) -> Iterator[SlideTextBlock]:
+        """Yield slide blocks as soon as their OCR (and caption) batch completes.
+
+        The analyzer is shared between concurrent runs, so per-call figures go
+        to ``stats`` rather than onto the instance.
+        """
+        cfg: ModelConfig = self.settings.models
+        stats = stats if stats is not None else AnalysisStats()
+        frame_infos = [
+            frame if isinstance(frame, FrameInfo) else FrameInfo(idx, *frame)
+            for idx, frame in enumerate(frames)
+        ]
+        ocr_stream = self._ocr_frames(frame_infos, stats)
+        window = max(cfg.ocr_batch_size, cfg.caption_batch_size, 1)
+        for start in range(0, len(frame_infos), window):
+            chunk = frame_infos[start : start + window]
+            ocr_lines = list(islice(ocr_stream, len(chunk)))
+            captions: dict[int, str | None] = {}
+            if self.captions_enabled:
+                captions = self._caption_frames(chunk, ocr_lines, stats)
+            for idx, (frame, lines) in enumerate(zip(chunk, ocr_lines)):
+                text = "\n".join(line.text for line in lines)
+                caption = captions.get(idx)
+                merged_text = "\n".join(filter(None, [text, caption or ""])).strip()
+                if not merged_text:
+                    continue
+                yield SlideTextBlock(
+                    frame_path=frame.path,
+                    timestamp=frame.timestamp,
                     text=text,
                     caption=caption,
+                    end=frame.end,
+                    lines=lines,
+                    image=frame.image,
                 )
+        modes = stats.ocr_modes
+        if modes["region"] or modes["unchanged"]:
+            share = stats.ocr_region_rows / max(stats.ocr_region_frame_rows, 1)
+            console.log(
+                f"[cyan]OCR[/] {modes['full']} full frames, {modes['region']} changed regions "
+                f"({share:.0%} of their rows), {modes['unchanged']} unchanged"
             )
-        return blocks
-
-    def _ocr_frame(self, frame_path: Path) -> str:
-        result = self.ocr.ocr(str(frame_path), cls=True)
-        lines: List[str] = []
-        for line in result:
-            for _, (text, score) in line:
-                if score > 0.7:
-                    lines.append(text)
-        return "\n".join(lines)
-
-    def _caption_frame(self, frame_path: Path) -> str | None:
-        if not self.model or not self.processor or not self.tokenizer:
-            return None
-        image = Image.open(frame_path).convert("RGB")
+
+    # region OCR
+    @staticmethod
+    def _load_ocr(cfg: ModelConfig) -> PaddleOCR:
+        from paddleocr import PaddleOCR
+
+        # Newer PaddleOCR uses `device` in common args; `use_gpu`/`show_log` are deprecated.
+        paddle_device = "gpu" if cfg.device == "cuda" else "cpu"
+        if hasattr(PaddleOCR, "predict"):
+            return PaddleOCR(
+                lang=cfg.ocr_lang,
+                device=paddle_device,
+                text_recognition_batch_size=cfg.ocr_batch_size,
+            )
+        return PaddleOCR(lang=cfg.ocr_lang, device=paddle_device)
+
+    def _ocr_frames(
+        self, frames: Sequence[FrameInfo], stats: AnalysisStats
+    ) -> Iterator[List[OcrLine]]:
+        """OCR frames in batches, yielding per-frame lines in input order.
+
+        With ``ocr_incremental``, a frame that differs from the previous one only
+        in a band of rows gets just that band OCR'd, and the result replaces the
+        previous frame's lines in the band. Frames are planned (decoded and
+        diffed) only as their batch is needed.
+        """
+        size = max(self.settings.models.ocr_batch_size, 1)
+        # Planned frames whose lines have not been yielded yet, in order.
+        planned: Deque[_OcrTask] = deque()
+
+        def batches() -> Iterator[List[_OcrTask]]:
+            batch: List[_OcrTask] = []
+            for task in self._plan_ocr(frames):
+                planned.append(task)
+                if task.unchanged:
+                    continue
+                batch.append(task)
+                if len(batch) == size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        previous: List[OcrLine] = []
+        # A None task flushes the unchanged frames after the last OCR'd one.
+        for done, result in chain(self._ocr_tasks(batches()), [(None, [])]):
+            while planned and planned[0] is not done:
+                planned.popleft()
+                stats.ocr_modes["unchanged"] += 1
+                yield previous
+            if done is None:
+                return
+            planned.popleft()
+            previous = self._resolve_lines(done, result, previous, stats)
+            yield previous
+
+    def _ocr_tasks(
+        self, batches: Iterator[List[_OcrTask]]
+    ) -> Iterator[tuple[_OcrTask, List[OcrLine]]]:
+        """OCR batches in order, with up to ``ocr_workers`` of them in flight."""
+        cfg: ModelConfig = self.settings.models
+
+        def ocr(batch: List[_OcrTask]) -> List[tuple[_OcrTask, List[OcrLine]]]:
+            return list(zip(batch, self._ocr_batch([_task_source(task) for task in batch])))
+
+        if cfg.ocr_workers <= 1:
+            for batch in batches:
+                yield from ocr(batch)
+            return
+        with ThreadPoolExecutor(max_workers=cfg.ocr_workers) as pool:
+            running: Deque[Future] = deque()
+            for batch in batches:
+                running.append(pool.submit(ocr, batch))
+                if len(running) >= cfg.ocr_workers:
+                    yield from running.popleft().result()
+            while running:
+                yield from running.popleft().result()
+
+    def _resolve_lines(
+        self,
+        task: _OcrTask,
+        result: List[OcrLine],
+        previous: List[OcrLine],
+        stats: AnalysisStats,
+    ) -> List[OcrLine]:
+        """A frame's lines from its OCR result (of the whole frame or of its band)."""
+        if task.band is None:
+            lines = result
+            stats.ocr_modes["full"] += 1
+        else:
+            merged = _merge_band(previous, result, task.band)
+            if merged is None:
+                # Lines without positions cannot be merged; read the whole frame.
+                merged = self._ocr_batch([_frame_source(task.frame)])[0]
+                stats.ocr_modes["full"] += 1
+            else:
+                stats.ocr_modes["region"] += 1
+                stats.ocr_region_rows += task.band[1] - task.band[0]
+                stats.ocr_region_frame_rows += task.shape[0]
+            lines = merged
+        if task.ignore is not None:
+            lines = [line for line in lines if not _centered_in(line, task.ignore)]
+        return lines
+
+    def _plan_ocr(self, frames: Sequence[FrameInfo]) -> Iterator[_OcrTask]:
+        """Decide per frame whether to OCR it in full, in a changed band, or not at all.
+
+        Only the previous frame's grayscale image is kept while planning.
+        """
+        cfg: ModelConfig = self.settings.models
+        if not cfg.ocr_incremental and cfg.ocr_ignore_region is None:
+            yield from (_OcrTask(frame) for frame in frames)
+            return
+        previous: np.ndarray | None = None
+        for frame in frames:
+            gray = cv2.cvtColor(frame.load(), cv2.COLOR_BGR2GRAY)
+            height, width = gray.shape
+            ignore = None
+            if cfg.ocr_ignore_region is not None:
+                x, y, w, h = cfg.ocr_ignore_region
+                ignore = (x * width, y * height, (x + w) * width, (y + h) * height)
+            task = _OcrTask(frame, shape=gray.shape, ignore=ignore)
+            if cfg.ocr_incremental and previous is not None and previous.shape == gray.shape:
+                changed = cv2.absdiff(previous, gray) > cfg.ocr_diff_threshold
+                if ignore is not None:
+                    x0, y0, x1, y1 = (int(v) for v in ignore)
+                    changed[y0:y1, x0:x1] = False
+                # Rows with only a few changed pixels are compression noise.
+                rows = np.flatnonzero(np.count_nonzero(changed, axis=1) > max(2, width // 500))
+                if not rows.size:
+                    task.unchanged = True
+                else:
+                    pad = max(4, height // 50)
+                    top, bottom = max(int(rows[0]) - pad, 0), min(int(rows[-1]) + 1 + pad, height)
+                    if bottom - top <= cfg.ocr_region_max_fraction * height:
+                        task.band = (top, bottom)
+            yield task
+            previous = gray
+
+    def _ocr_batch(self, sources: List[FrameSource]) -> List[List[OcrLine]]:
+        cfg: ModelConfig = self.settings.models
+        slot = self._ocr_slots.get()
+        key = ("paddleocr", cfg.ocr_lang, cfg.device, cfg.ocr_batch_size, slot)
+        name = f"paddleocr:{cfg.ocr_lang} #{slot}"
+        try:
+            with self.models.acquire(key, name, lambda: self._load_ocr(cfg)) as engine:
+                # PaddleOCR accepts BGR arrays directly, avoiding a disk round trip.
+                inputs = [s if isinstance(s, np.ndarray) else str(s) for s in sources]
+                if hasattr(engine, "predict"):
+                    # PaddleOCR 3.x runs detection and recognition over the whole batch.
+                    return [self._parse_v3(result) for result in engine.predict(inputs)]
+                return [self._parse_v2(engine.ocr(item, cls=True)) for item in inputs]
+        finally:
+            self._ocr_slots.put(slot)
+
+    def _parse_v2(self, result: Any) -> List[OcrLine]:
+        lines: List[OcrLine] = []
+        for page in result or []:
+            for points, (text, score) in page or []:
+                if score > self.settings.models.ocr_min_score:
+                    lines.append(OcrLine(text, float(score), _points_box(points)))
+        return lines
+
+    def _parse_v3(self, result: Any) -> List[OcrLine]:
+        texts, scores = result["rec_texts"], result["rec_scores"]
+        boxes = result.get("rec_boxes")
+        if boxes is None or len(boxes) != len(texts):
+            boxes = [None] * len(texts)
+        return [
+            OcrLine(text, float(score), None if box is None else _box(box))
+            for text, score, box in zip(texts, scores, boxes)
+            if score > self.settings.models.ocr_min_score
+        ]
+
+    # endregion
+    # region captions
+    def _caption_frames(
+        self,
+        frames: Sequence[FrameInfo],
+        ocr_lines: Sequence[List[OcrLine]],
+        stats: AnalysisStats,
+    ) -> dict[int, str | None]:
+        cfg: ModelConfig = self.settings.models
+        wanted = [
+            idx
+            for idx, lines in enumerate(ocr_lines)
+            if cfg.caption_skip_ocr_chars is None
+            or sum(len(line.text) for line in lines) < cfg.caption_skip_ocr_chars
+        ]
+        if len(wanted) < len(frames):
+            console.log(f"[cyan]Captioning[/] {len(wanted)}/{len(frames)} slides (rest text-heavy)")
+
+        captions: dict[int, str | None] = {}
+        size = max(cfg.caption_batch_size, 1)
+        for start in range(0, len(wanted), size):
+            batch = wanted[start : start + size]
+            began = time.perf_counter()
+            results = self._caption_batch([_frame_source(frames[idx]) for idx in batch])
+            elapsed = time.perf_counter() - began
+            stats.caption_batch_seconds.append(elapsed)
+            console.log(f"[cyan]Caption batch[/] {len(batch)} slides in {elapsed:.2f}s")
+            captions.update(zip(batch, results))
+        return captions
+
+    @staticmethod
+    def _load_vlm(cfg: ModelConfig) -> tuple[Any, Any, Any]:
+        from transformers import AutoProcessor, AutoTokenizer, LlavaForConditionalGeneration
+
+        processor = AutoProcessor.from_pretrained(cfg.vlm_model)
+        tokenizer = AutoTokenizer.from_pretrained(cfg.vlm_model)
+        # Decoder-only generation needs left padding so every prompt in a
+        # batch ends where generation starts.
+        tokenizer.padding_side = "left"
+        if getattr(processor, "tokenizer", None) is not None:
+            processor.tokenizer.padding_side = "left"
+        model = LlavaForConditionalGeneration.from_pretrained(cfg.vlm_model, device_map="auto")
+        return processor, tokenizer, model
+
+    def _caption_batch(self, sources: List[FrameSource]) -> List[str | None]:
+        cfg: ModelConfig = self.settings.models
+        with self.models.acquire(
+            ("vlm", cfg.vlm_model), f"vlm:{cfg.vlm_model}", lambda: self._load_vlm(cfg)
+        ) as (processor, tokenizer, model):
+            return self._generate_captions(processor, tokenizer, model, sources)
+
+    def _generate_captions(
+        self, processor: Any, tokenizer: Any, model: Any, sources: List[FrameSource]
+    ) -> List[str | None]:
+        images = [
+            Image.fromarray(np.ascontiguousarray(s[:, :, ::-1]))
+            if isinstance(s, np.ndarray)
+            else Image.open(s).convert("RGB")
+            for s in sources
+        ]
         prompt = "Describe the lecture slide content thoroughly for study notes:"
-        inputs = self.processor(prompt, image, return_tensors="pt").to(self.model.device)
-        generated_ids = self.model.generate(
+        inputs = processor(
+            text=[prompt] * len(images), images=images, return_tensors="pt", padding=True
+        ).to(model.device)
+        generated_ids = model.generate(
             **inputs,
-            max_new_tokens=128,
+            max_new_tokens=self.settings.models.caption_max_new_tokens,
             do_sample=False,
+            pad_token_id=tokenizer.pad_token_id,
         )
-        caption = self.tokenizer.batch_decode(generated_ids, skip_special_tokens=True)
-        return caption[0].strip() if caption else None
+        # Decode only the generated continuation, not the (padded) prompt.
+        new_tokens = generated_ids[:, inputs["input_ids"].shape[1] :]
+        captions = tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
+        return [caption.strip() or None for caption in captions]
+
+    # endregion
+
+
+def _frame_source(frame: FrameInfo) -> FrameSource:
+    return frame.image if frame.image is not None else frame.path
+
+
+# region incremental OCR
+@dataclass
+class _OcrTask:
+    frame: FrameInfo
+    shape: tuple[int, int] = (0, 0)
+    # Rows [top, bottom) that changed since the previous frame; only they are OCR'd.
+    band: tuple[int, int] | None = None
+    # Nothing outside the ignored region changed; the previous lines are reused.
+    unchanged: bool = False
+    # Ignored region in pixels; lines centered in it are dropped.
+    ignore: Box | None = None
+
+
+def _task_source(task: _OcrTask) -> FrameSource:
+    if task.band is None:
+        return _frame_source(task.frame)
+    top, bottom = task.band
+    return task.frame.load()[top:bottom]
+
+
+def _box(values: Any) -> Box:
+    x0, y0, x1, y1 = (float(v) for v in values)
+    return x0, y0, x1, y1
+
+
+def _points_box(points: Any) -> Box | None:
+    try:
+        xs, ys = zip(*((float(x), float(y)) for x, y in points))
+    except (TypeError, ValueError):
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _centered_in(line: OcrLine, region: Box) -> bool:
+    if line.box is None:
+        return False
+    x0, y0, x1, y1 = line.box
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    return region[0] <= cx < region[2] and region[1] <= cy < region[3]
+
+
+def _overlaps(a: Box, b: Box) -> bool:
+    """Whether two line boxes share columns and most of the shorter one's height."""
+    if min(a[2], b[2]) <= max(a[0], b[0]):
+        return False
+    shared = min(a[3], b[3]) - max(a[1], b[1])
+    return shared > 0.5 * min(a[3] - a[1], b[3] - b[1])
+
+
+def _merge_band(
+    previous: List[OcrLine], band_lines: List[OcrLine], band: tuple[int, int]
+) -> List[OcrLine] | None:
+    """Previous lines with those in ``band`` replaced by the band's OCR, in reading order.
+
+    Previous lines cut by the band's edge are kept, and band lines overlapping
+    them dropped. None when a line has no box to place it by.
+    """
+    if any(line.box is None for line in previous) or any(line.box is None for line in band_lines):
+        return None
+    top, bottom = band
+    kept = [line for line in previous if not top <= (line.box[1] + line.box[3]) / 2 < bottom]
+    added = []
+    for line in band_lines:
+        x0, y0, x1, y1 = line.box
+        placed = replace(line, box=(x0, y0 + top, x1, y1 + top))
+        if not any(_overlaps(placed.box, other.box) for other in kept):
+            added.append(placed)
+    return sorted(kept + added, key=lambda line: (line.box[1], line.box[0]))
+
+
+# endregion
 
 
-__all__ = ["SlideAnalyzer", "SlideTextBlock"]
+__all__ = ["SlideAnalyzer", "SlideTextBlock", "OcrLine", "AnalysisStats"]
 
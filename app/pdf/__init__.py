@@ -1,8 +1,24 @@
-"""PDF generation helpers."""
+"""PDF generation helpers.
 
-from .slides import SlidePdfBuilder
-from .transcript import TranscriptPdfBuilder
-from .combined import CombinedPdfBuilder
+Builders are imported on first attribute access so that importing the package
+does not load ReportLab.
+"""
 
-__all__ = ["SlidePdfBuilder", "TranscriptPdfBuilder", "CombinedPdfBuilder"]
+from __future__ import annotations
 
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "SlidePdfBuilder": ".slides",
+    "TranscriptPdfBuilder": ".transcript",
+    "CombinedPdfBuilder": ".combined",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, Iterator, List, Sequence
 
 from reportlab.lib.pagesizes import landscape
 from reportlab.pdfgen import canvas
@@ -12,6 +12,7 @@ from reportlab.pdfgen import canvas
 from ..config import PdfConfig, Settings, resolve_settings
 from ..models.audio import TranscriptSegment
 from ..models.vision import SlideTextBlock
+from .images import fit_to_budget, slide_image
 
 
 @dataclass
@@ -24,17 +25,29 @@ class CombinedPdfBuilder:
     def build(
         self,
         slides: Iterable[SlideTextBlock],
-        grouped_transcript: dict[str, List[TranscriptSegment]],
+        grouped_transcript: Sequence[List[TranscriptSegment]],
         output_path: Path,
     ) -> Path:
+        """Render one page per slide; ``grouped_transcript[i]`` is the text of slide ``i``."""
         output_path.parent.mkdir(parents=True, exist_ok=True)
         cfg: PdfConfig = self.settings.pdf
-        page_size = (cfg.page_width, cfg.page_height)
-        c = canvas.Canvas(str(output_path), pagesize=page_size)
-        for block in slides:
-            bucket = grouped_transcript.get(str(block.frame_path), [])
-            self._draw_page(c, block, bucket, cfg, page_size)
-        c.save()
+        drawn: List[SlideTextBlock] = []
+
+        def record() -> Iterator[SlideTextBlock]:
+            for block in slides:
+                drawn.append(block)
+                yield block
+
+        def render(blocks: Iterable[SlideTextBlock], scale: float) -> None:
+            page_size = (cfg.page_width, cfg.page_height)
+            c = canvas.Canvas(str(output_path), pagesize=page_size)
+            for idx, block in enumerate(blocks):
+                bucket = grouped_transcript[idx] if idx < len(grouped_transcript) else []
+                self._draw_page(c, block, bucket, cfg, page_size, scale)
+            c.save()
+
+        render(record(), 1.0)
+        fit_to_budget(output_path, cfg, lambda scale: render(drawn, scale))
         return output_path
 
     def _draw_page(
@@ -44,13 +57,15 @@ class CombinedPdfBuilder:
         transcript_segments: List[TranscriptSegment],
         cfg: PdfConfig,
         page_size,
+        scale: float = 1.0,
     ) -> None:
         width, height = page_size
         half = width / 2
         image_width = half - 2 * cfg.margin
         image_height = height - 2 * cfg.margin
+        image, _ = slide_image(slide, cfg, (image_width, image_height), scale)
         c.drawImage(
-            str(slide.frame_path),
+            image,
             cfg.margin,
             cfg.margin,
             image_width,
@@ -0,0 +1,111 @@
+"""Frame image sources shared by the PDF builders."""
+
+from __future__ import annotations
+
+import math
+from io import BytesIO
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+from reportlab.lib.utils import ImageReader
+from rich.console import Console
+
+from ..config import PdfConfig
+from ..models.vision import SlideTextBlock
+
+console = Console()
+
+# Size-budget passes before giving up; each one re-renders the whole PDF.
+_MAX_SHRINK_PASSES = 4
+
+
+def target_pixels(
+    size: tuple[int, int], box: tuple[float, float], dpi: int | None, scale: float = 1.0
+) -> tuple[int, int]:
+    """Pixel size at which an image of ``size`` fitted into ``box`` (points) has ``dpi``.
+
+    Images are never upscaled; ``scale`` shrinks the result further.
+    """
+    width, height = size
+    factor = 1.0 if dpi is None else min(box[0] / width, box[1] / height) * dpi / 72
+    factor = min(factor, 1.0) * scale
+    return max(round(width * factor), 1), max(round(height * factor), 1)
+
+
+def slide_image(
+    block: SlideTextBlock, cfg: PdfConfig, box: tuple[float, float], scale: float = 1.0
+) -> tuple[ImageReader, tuple[int, int]]:
+    """Return a drawable image for ``block`` fitted to ``box``, with its pixel size.
+
+    Frames are downscaled to ``cfg.image_dpi`` for the box and JPEG-encoded once
+    per pixel size; the bytes are cached on the block, so a frame drawn on
+    several pages is embedded once (``drawImage`` shares identical images as a
+    single XObject) and the raw array can be released after its first page.
+    """
+    full_resolution = cfg.image_dpi is None and scale == 1.0
+    if full_resolution and block.image is None and block.frame_path.exists():
+        reader = ImageReader(str(block.frame_path))
+        return reader, reader.getSize()
+    size = target_pixels(_source_size(block), box, cfg.image_dpi, scale)
+    if size not in block.encoded:
+        image = _load_source(block, size)
+        if image.size != size:
+            image = image.resize(size, Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", quality=cfg.jpeg_quality, optimize=True)
+        block.encoded[size] = buffer.getvalue()
+    return ImageReader(BytesIO(block.encoded[size])), size
+
+
+def fit_to_budget(output_path: Path, cfg: PdfConfig, render: Callable[[float], None]) -> float:
+    """Re-render ``output_path`` with smaller images until it fits ``cfg.max_file_bytes``.
+
+    ``render`` redraws the document with images scaled by the given factor.
+    Returns the factor finally used.
+    """
+    scale = 1.0
+    if cfg.max_file_bytes is None:
+        return scale
+    for _ in range(_MAX_SHRINK_PASSES):
+        size = output_path.stat().st_size
+        if size <= cfg.max_file_bytes:
+            return scale
+        # JPEG size grows roughly with pixel count, so shrink each side by the
+        # square root of the overshoot, with some headroom for the text.
+        scale *= math.sqrt(cfg.max_file_bytes / size) * 0.95
+        console.log(
+            f"[yellow]{output_path.name}[/] is {size / 1e6:.1f} MB, over budget; "
+            f"scaling images by {scale:.2f}"
+        )
+        render(scale)
+    if output_path.stat().st_size > cfg.max_file_bytes:
+        console.log(f"[yellow]{output_path.name} still exceeds {cfg.max_file_bytes} bytes[/]")
+    return scale
+
+
+def _source_size(block: SlideTextBlock) -> tuple[int, int]:
+    if block.image is not None:
+        height, width = block.image.shape[:2]
+        return width, height
+    if block.frame_path.exists():
+        with Image.open(block.frame_path) as image:
+            return image.size
+    return max(block.encoded, key=lambda size: size[0] * size[1])
+
+
+def _load_source(block: SlideTextBlock, size: tuple[int, int]) -> Image.Image:
+    """Best available pixels: the frame array, the frame file, else the largest encoding."""
+    if block.image is not None:
+        return Image.fromarray(np.ascontiguousarray(block.image[:, :, ::-1]))
+    if block.frame_path.exists():
+        image = Image.open(block.frame_path)
+        # JPEG frames decode straight to a reduced scale when that is enough.
+        image.draft("RGB", size)
+        return image.convert("RGB")
+    largest = max(block.encoded, key=lambda size: size[0] * size[1])
+    return Image.open(BytesIO(block.encoded[largest])).convert("RGB")
+
+
+__all__ = ["slide_image", "fit_to_budget", "target_pixels"]
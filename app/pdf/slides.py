@@ -4,9 +4,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator, List
 
-from PIL import Image
 from reportlab.lib.pagesizes import landscape
 from reportlab.pdfgen import canvas
 from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
@@ -15,6 +14,7 @@ from reportlab.lib.units import inch
 
 from ..config import PdfConfig, Settings, resolve_settings
 from ..models.vision import SlideTextBlock
+from .images import fit_to_budget, slide_image
 
 
 @dataclass
@@ -27,30 +27,42 @@ class SlidePdfBuilder:
     def build(self, blocks: Iterable[SlideTextBlock], output_path: Path) -> Path:
         output_path.parent.mkdir(parents=True, exist_ok=True)
         cfg: PdfConfig = self.settings.pdf
-        page_size = (cfg.page_width, cfg.page_height)
+        drawn: List[SlideTextBlock] = []
 
-        c = canvas.Canvas(str(output_path), pagesize=page_size)
-        for block in blocks:
-            self._draw_slide_page(c, block, page_size, cfg)
-        c.save()
+        def record() -> Iterator[SlideTextBlock]:
+            for block in blocks:
+                drawn.append(block)
+                yield block
+
+        def render(pages: Iterable[SlideTextBlock], scale: float) -> None:
+            page_size = (cfg.page_width, cfg.page_height)
+            c = canvas.Canvas(str(output_path), pagesize=page_size)
+            for block in pages:
+                self._draw_slide_page(c, block, page_size, cfg, scale)
+            c.save()
+
+        render(record(), 1.0)
+        fit_to_budget(output_path, cfg, lambda scale: render(drawn, scale))
         return output_path
 
-    def _draw_slide_page(self, c: canvas.Canvas, block: SlideTextBlock, page_size, cfg: PdfConfig) -> None:
+    def _draw_slide_page(
+        self, c: canvas.Canvas, block: SlideTextBlock, page_size, cfg: PdfConfig, scale: float
+    ) -> None:
         width, height = page_size
         c.setFont(cfg.font_name, cfg.font_size)
-        c.drawString(cfg.margin, height - cfg.margin, f"Timestamp: {block.timestamp:.2f}s")
-
-        img = Image.open(block.frame_path)
-        img_width, img_height = img.size
-        scale = min(
-            (width - 2 * cfg.margin) / img_width,
-            (height / 2) / img_height,
-        )
-        draw_width = img_width * scale
-        draw_height = img_height * scale
+        label = f"Timestamp: {block.timestamp:.2f}s"
+        if block.end is not None and block.end > block.timestamp:
+            label = f"Timestamp: {block.timestamp:.2f}s - {block.end:.2f}s"
+        c.drawString(cfg.margin, height - cfg.margin, label)
+
+        box = (width - 2 * cfg.margin, height / 2)
+        image, (img_width, img_height) = slide_image(block, cfg, box, scale)
+        fit = min(box[0] / img_width, box[1] / img_height)
+        draw_width = img_width * fit
+        draw_height = img_height * fit
         x = (width - draw_width) / 2
         y = (height - draw_height) - cfg.margin * 2
-        c.drawInlineImage(str(block.frame_path), x, y, draw_width, draw_height)
+        c.drawImage(image, x, y, draw_width, draw_height)
 
         text_object = c.beginText(cfg.margin, cfg.margin * 2)
         body = block.text
@@ -2,28 +2,206 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable
+from typing import Dict, Iterable, Iterator, List
 
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen import canvas
+from reportlab.pdfgen.textobject import PDFTextObject
+from reportlab.platypus import Flowable, Paragraph, SimpleDocTemplate, Spacer
 
+from ..config import PdfConfig, Settings, resolve_settings
 from ..models.audio import TranscriptSegment
 
 
+@dataclass
+class TranscriptParagraph:
+    """Consecutive segments merged under one timestamp."""
+
+    start: float
+    end: float
+    text: str
+
+
+def merge_segments(
+    segments: Iterable[TranscriptSegment], max_seconds: float
+) -> Iterator[TranscriptParagraph]:
+    """Group segments into paragraphs spanning at most ``max_seconds`` each."""
+    current: TranscriptParagraph | None = None
+    parts: List[str] = []
+    for seg in segments:
+        if current is not None and seg.end - current.start > max_seconds:
+            current.text = " ".join(parts)
+            yield current
+            current = None
+        if current is None:
+            current = TranscriptParagraph(seg.start, seg.end, "")
+            parts = []
+        current.end = seg.end
+        if seg.text:
+            parts.append(seg.text)
+    if current is not None:
+        current.text = " ".join(parts)
+        yield current
+
+
+class _LazyStory(list):
+    """List facade that pulls flowables from an iterator as platypus consumes them.
+
+    ``BaseDocTemplate.build`` only checks ``len()``, reads and deletes the head
+    and pushes split remainders back to the front, so holding a couple of
+    flowables at a time is enough and the story never materializes in memory.
+    """
+
+    def __init__(self, source: Iterator[Flowable]) -> None:
+        super().__init__()
+        self._source = source
+
+    def __len__(self) -> int:
+        if not super().__len__():
+            nxt = next(self._source, None)
+            if nxt is not None:
+                self.append(nxt)
+        return super().__len__()
+
+
+class _WidthCache:
+    """Memoized string widths for one font, so each distinct word is measured once."""
+
+    def __init__(self, font_name: str, font_size: float) -> None:
+        self.font_name = font_name
+        self.font_size = font_size
+        self._widths: Dict[str, float] = {}
+        self.space = self(" ")
+
+    def __call__(self, text: str) -> float:
+        width = self._widths.get(text)
+        if width is None:
+            width = pdfmetrics.stringWidth(text, self.font_name, self.font_size)
+            self._widths[text] = width
+        return width
+
+
+def wrap_words(words: Iterable[str], widths: _WidthCache, first: float, rest: float) -> List[str]:
+    """Greedy line breaking; the first line is ``first`` points wide, later ones ``rest``."""
+    lines: List[str] = []
+    line: List[str] = []
+    used = 0.0
+    limit = first
+    for word in words:
+        width = widths(word)
+        if line and used + widths.space + width > limit:
+            lines.append(" ".join(line))
+            line, used, limit = [], 0.0, rest
+        if not line and width > limit:
+            # A single word wider than the line is broken by characters.
+            while word and widths(word) > limit:
+                cut = max(_fitting_prefix(word, widths, limit), 1)
+                lines.append(word[:cut])
+                word, limit = word[cut:], rest
+            width = widths(word)
+            if not word:
+                continue
+        used += (widths.space if line else 0.0) + width
+        line.append(word)
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+
+def _fitting_prefix(word: str, widths: _WidthCache, limit: float) -> int:
+    used = 0.0
+    for idx, char in enumerate(word):
+        used += widths(char)
+        if used > limit:
+            return idx
+    return len(word)
+
+
+@dataclass
 class TranscriptPdfBuilder:
     """Render transcript text grouped by timestamps."""
 
+    # Use default_factory to avoid mutable default Settings instance at class definition time.
+    settings: Settings = field(default_factory=resolve_settings)
+
     def build(self, segments: Iterable[TranscriptSegment], output_path: Path) -> Path:
+        """Render ``segments``, which may be a generator still being produced."""
         output_path.parent.mkdir(parents=True, exist_ok=True)
+        cfg: PdfConfig = self.settings.pdf
+        if cfg.transcript_engine == "platypus":
+            return self._build_platypus(segments, output_path)
+        return self._build_canvas(segments, output_path, cfg)
+
+    def _build_canvas(
+        self, segments: Iterable[TranscriptSegment], output_path: Path, cfg: PdfConfig
+    ) -> Path:
+        width, height = letter
+        margin = inch
+        leading = cfg.font_size * 1.2
+        body = _WidthCache(cfg.font_name, cfg.font_size)
+        bold = _WidthCache(_bold_font(cfg.font_name), cfg.font_size)
+        line_width = width - 2 * margin
+
+        c = canvas.Canvas(str(output_path), pagesize=letter)
+        y = height - margin
+
+        def new_text(top: float) -> PDFTextObject:
+            text = c.beginText(margin, top - cfg.font_size)
+            # Each page starts a new text object, which would otherwise be in
+            # the canvas default font that lines were not wrapped for.
+            text.setFont(body.font_name, cfg.font_size, leading)
+            return text
+
+        text = new_text(y)
+        for para in merge_segments(segments, cfg.transcript_paragraph_seconds):
+            stamp = f"[{para.start:06.2f} - {para.end:06.2f}] "
+            stamp_width = bold(stamp)
+            lines = wrap_words(para.text.split(), body, line_width - stamp_width, line_width)
+            for idx, line in enumerate(lines or [""]):
+                if y - leading < margin:
+                    c.drawText(text)
+                    c.showPage()
+                    y = height - margin
+                    text = new_text(y)
+                if idx == 0:
+                    text.setFont(bold.font_name, cfg.font_size)
+                    text.textOut(stamp)
+                    text.setFont(body.font_name, cfg.font_size)
+                text.textLine(line)
+                y -= leading
+            # Blank line between paragraphs.
+            text.textLine("")
+            y -= leading
+        c.drawText(text)
+        c.save()
+        return output_path
+
+    def _build_platypus(self, segments: Iterable[TranscriptSegment], output_path: Path) -> Path:
         doc = SimpleDocTemplate(str(output_path), pagesize=letter)
         styles = getSampleStyleSheet()
-        story = []
-        for seg in segments:
-            timestamp = f"[{seg.start:06.2f} - {seg.end:06.2f}]"
-            story.append(Paragraph(f"<b>{timestamp}</b> {seg.text}", styles["BodyText"]))
-            story.append(Spacer(1, 12))
-        doc.build(story)
+
+        def story() -> Iterator[Flowable]:
+            for seg in segments:
+                timestamp = f"[{seg.start:06.2f} - {seg.end:06.2f}]"
+                yield Paragraph(f"<b>{timestamp}</b> {seg.text}", styles["BodyText"])
+                yield Spacer(1, 12)
+
+        doc.build(_LazyStory(story()))
         return output_path
 
+
+def _bold_font(font_name: str) -> str:
+    candidate = f"{font_name}-Bold"
+    try:
+        pdfmetrics.getFont(candidate)
+    except KeyError:
+        return font_name
+    return candidate
+
+
+__all__ = ["TranscriptPdfBuilder", "TranscriptParagraph", "merge_segments"]
@@ -2,20 +2,39 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
 
+import numpy as np
 from rich.console import Console
 
-from .config import IngestRequest, Settings, resolve_settings
-from .ingest import VideoIngestor
-from .media import MediaExtractor
-from .models import SlideAnalyzer, WhisperTranscriber
+from .cache import CacheStats, StageCache, file_digest, link_or_copy
+from .config import BatchConfig, IngestRequest, Settings, resolve_settings
+from .dedup import FrameDeduplicator
+from .ingest import IngestResult, VideoIngestor
+from .media import FrameInfo, MediaExtractor
+from .metrics import StageMetrics, get_metrics_registry, measure_stage, write_metrics
+from .models import AnalysisStats, OcrLine, SlideAnalyzer, SlideTextBlock, WhisperTranscriber
+from .models.audio import WHISPER_SAMPLE_RATE, TranscriptSegment, TranscriptWord
 from .pdf import CombinedPdfBuilder, SlidePdfBuilder, TranscriptPdfBuilder
-from .sync import group_transcript_by_slide
+from .search import SearchIndex
+from .sync import align_transcript
+from .vectors import VectorIndex, iter_chunks
 
 console = Console()
 
+# Receives (stage name, state) where state is "running", "done" or "failed".
+ProgressCallback = Callable[[str, str], None]
+
+
+class PipelineCancelled(RuntimeError):
+    """Raised when a run is cancelled before all stages have started."""
+
 
 @dataclass
 class PipelineResult:
@@ -23,47 +42,663 @@ class PipelineResult:
     slide_pdf: Path
     transcript_pdf: Path
     combined_pdf: Path
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    critical_path: List[str] = field(default_factory=list)
+    cache_stats: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    metrics: Dict[str, StageMetrics] = field(default_factory=dict)
+    metrics_path: Path | None = None
+
+
+@dataclass
+class StageTiming:
+    """Wall-clock window of a finished stage, relative to scheduler start."""
+
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class _Stage:
+    name: str
+    fn: Callable[..., Any]
+    deps: tuple[str, ...]
+    resource: str | None = None
+    # Unit and counter of the items a stage produces, for throughput metrics.
+    unit: str = "items"
+    count: Callable[[Any], float | None] | None = None
+
+
+class StageLimits:
+    """Named concurrency limits shared by pipeline runs in one process.
+
+    Stages that use a limited resource (``download``, ``ffmpeg``, ``ocr``,
+    ``whisper``) hold one of its slots while they run; resources without a
+    positive limit are unrestricted.
+    """
+
+    def __init__(self, limits: Dict[str, int] | None = None) -> None:
+        self._semaphores = {
+            name: threading.BoundedSemaphore(count)
+            for name, count in (limits or {}).items()
+            if count > 0
+        }
+
+    @classmethod
+    def from_config(cls, cfg: BatchConfig) -> StageLimits:
+        return cls(
+            {
+                "download": cfg.download_limit,
+                "ffmpeg": cfg.ffmpeg_limit,
+                "ocr": cfg.ocr_limit,
+                "whisper": cfg.whisper_limit,
+            }
+        )
+
+    @contextmanager
+    def hold(self, resource: str | None) -> Iterator[None]:
+        semaphore = self._semaphores.get(resource) if resource else None
+        if semaphore is None:
+            yield
+            return
+        with semaphore:
+            yield
+
+
+class StageScheduler:
+    """Run a DAG of named stages, starting each one as soon as its dependencies finish.
+
+    Stage callables receive the results of their dependencies positionally, in the
+    order the dependencies were declared. Work runs on threads: the heavy stages
+    spend their time in ffmpeg subprocesses or native inference code that releases
+    the GIL, and the models they use live in this process.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        on_progress: ProgressCallback | None = None,
+        should_cancel: Callable[[], bool] | None = None,
+        limits: StageLimits | None = None,
+    ) -> None:
+        self.max_workers = max(max_workers, 1)
+        self.stages: Dict[str, _Stage] = {}
+        self.timings: Dict[str, StageTiming] = {}
+        self.metrics: Dict[str, StageMetrics] = {}
+        self.on_progress = on_progress
+        self.should_cancel = should_cancel
+        self.limits = limits or StageLimits()
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        *deps: str,
+        resource: str | None = None,
+        unit: str = "items",
+        count: Callable[[Any], float | None] | None = None,
+    ) -> None:
+        """Register a stage; ``count`` maps its result to a number of ``unit``
+        (by default the length of a list, tuple or dict result)."""
+        missing = [dep for dep in deps if dep not in self.stages]
+        if missing:
+            msg = f"Stage {name!r} depends on unknown stages: {missing}"
+            raise ValueError(msg)
+        self.stages[name] = _Stage(name, fn, deps, resource, unit, count)
+
+    def run(self) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        pending = dict(self.stages)
+        running: Dict[Future, str] = {}
+        origin = time.perf_counter()
+
+        def execute(stage: _Stage, args: list[Any]) -> Any:
+            with self.limits.hold(stage.resource):
+                # Time spent waiting for a resource slot is not stage work.
+                self._notify(stage.name, "running")
+                start = time.perf_counter() - origin
+                with measure_stage(stage.name, stage.unit) as metrics:
+                    value = stage.fn(*args)
+                    metrics.items = (stage.count or _count_items)(value)
+                self.timings[stage.name] = StageTiming(start, time.perf_counter() - origin)
+                self.metrics[stage.name] = metrics
+            self._notify(stage.name, "done")
+            return value
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                if pending and self.should_cancel and self.should_cancel():
+                    # Running stages cannot be interrupted; let them finish.
+                    wait(running)
+                    raise PipelineCancelled(f"Cancelled before stages {list(pending)}")
+                # Stages are submitted in declaration order, so a single worker
+                # reproduces the sequential pipeline.
+                for name, stage in list(pending.items()):
+                    if all(dep in results for dep in stage.deps):
+                        args = [results[dep] for dep in stage.deps]
+                        running[pool.submit(execute, stage, args)] = name
+                        del pending[name]
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        console.log(f"[bold red]Stage failed[/] {name}")
+                        self._notify(name, "failed")
+                        raise
+        return results
+
+    def _notify(self, name: str, state: str) -> None:
+        if self.on_progress is not None:
+            self.on_progress(name, state)
+
+    def critical_path(self) -> List[str]:
+        """Chain of stages that determined the total wall-clock time."""
+        if not self.timings:
+            return []
+        current = max(self.timings, key=lambda name: self.timings[name].end)
+        path = [current]
+        while self.stages[current].deps:
+            current = max(self.stages[current].deps, key=lambda dep: self.timings[dep].end)
+            path.append(current)
+        return list(reversed(path))
 
 
 class PipelineRunner:
     """Composable pipeline runner used by CLI and FastAPI."""
 
-    def __init__(self, settings: Settings | None = None) -> None:
+    def __init__(self, settings: Settings | None = None, limits: StageLimits | None = None) -> None:
         self.settings = settings or resolve_settings()
+        self.limits = limits or StageLimits()
         self.ingestor = VideoIngestor(self.settings)
         self.extractor = MediaExtractor(self.settings)
+        self.deduplicator = FrameDeduplicator(self.settings)
+        self.cache = StageCache(self.settings)
         self.transcriber = WhisperTranscriber(self.settings)
         self.slide_analyzer = SlideAnalyzer(self.settings)
         self.slide_pdf_builder = SlidePdfBuilder(self.settings)
-        self.transcript_pdf_builder = TranscriptPdfBuilder()
+        self.transcript_pdf_builder = TranscriptPdfBuilder(self.settings)
         self.combined_pdf_builder = CombinedPdfBuilder(self.settings)
 
-    def run(self, request: IngestRequest) -> PipelineResult:
-        ingest_result = self.ingestor.ingest(request)
-        video_id = ingest_result.video_id
+    def run(
+        self,
+        request: IngestRequest,
+        on_progress: ProgressCallback | None = None,
+        should_cancel: Callable[[], bool] | None = None,
+    ) -> PipelineResult:
+        ingest_result: IngestResult | None = None
+        ingest_metrics: StageMetrics | None = None
+        split = self.ingestor.splits_streams(request)
+        if split:
+            # Streams are fetched by the fetch_audio/fetch_video stages below.
+            video_id, raw_dir = self.ingestor.allocate()
+        else:
+            if on_progress:
+                on_progress("ingest", "running")
+            with self.limits.hold("download"), measure_stage("ingest", "bytes") as ingest_metrics:
+                ingest_result = self.ingestor.ingest(request)
+                ingest_metrics.items = _file_bytes(ingest_result.video_path)
+            if on_progress:
+                on_progress("ingest", "done")
+            video_id = ingest_result.video_id
         console.log(f"[bold green]Processing video[/] {video_id}")
 
         processed_dir = self.settings.paths.processed_dir / video_id
         processed_dir.mkdir(parents=True, exist_ok=True)
 
-        audio_path = self.extractor.extract_audio(
-            ingest_result.video_path, processed_dir / "audio"
+        pipeline_cfg = self.settings.pipeline
+        scheduler = StageScheduler(
+            pipeline_cfg.max_workers if pipeline_cfg.concurrent_stages else 1,
+            on_progress=on_progress,
+            should_cancel=should_cancel,
+            limits=self.limits,
+        )
+
+        def cache_keys(source: Path) -> tuple[str, str, str]:
+            # Local ingest has already hashed the file it placed.
+            if ingest_result is not None and ingest_result.content_hash:
+                return self._cache_keys(ingest_result.content_hash)
+            return self._cache_keys(file_digest(source))
+
+        # Frames held only in memory cannot be served from disk on a later run.
+        cache_visual = not self.settings.extract.in_memory_frames
+
+        # Sources: one ingested file, or separately downloaded streams.
+        if split:
+
+            def fetch_audio() -> Path:
+                return self.ingestor.download_stream(request.source, raw_dir, "audio")
+
+            def fetch_video() -> Path:
+                return self.ingestor.download_stream(request.source, raw_dir, "video")
+
+            scheduler.add(
+                "fetch_audio", fetch_audio, resource="download", unit="bytes", count=_file_bytes
+            )
+            scheduler.add(
+                "fetch_video", fetch_video, resource="download", unit="bytes", count=_file_bytes
+            )
+            audio_source, video_source = "fetch_audio", "fetch_video"
+        else:
+            assert ingest_result is not None
+            video_path = ingest_result.video_path
+            scheduler.add("source", lambda: video_path)
+            audio_source = video_source = "source"
+
+        # Audio branch
+        def extract_audio_file(source: Path) -> Path | np.ndarray:
+            if self.settings.extract.keep_audio_wav:
+                return self.extractor.extract_audio(source, processed_dir / "audio")
+            return self.extractor.decode_audio(source, WHISPER_SAMPLE_RATE)
+
+        def extract_audio(source: Path) -> Path | np.ndarray | None:
+            # A cached transcript makes the audio track unnecessary.
+            if self.cache.contains(cache_keys(source)[0]):
+                return None
+            return extract_audio_file(source)
+
+        slide_pdf_path = processed_dir / "slides.pdf"
+        transcript_pdf_path = processed_dir / "transcript.pdf"
+        # PDFs already written while their inputs streamed in (cache misses).
+        streamed: set[str] = set()
+        # Hits and misses of this run only; the runner's cache is shared between runs.
+        run_cache_stats = CacheStats()
+        # Work measured inside another stage (captioning runs within analyze).
+        nested_metrics: Dict[str, StageMetrics] = {}
+
+        def transcribe(
+            source: Path, extracted: Path | np.ndarray | None
+        ) -> List[TranscriptSegment]:
+            def compute() -> List[TranscriptSegment]:
+                segments: List[TranscriptSegment] = []
+
+                def stream() -> Iterator[TranscriptSegment]:
+                    audio = extracted if extracted is not None else extract_audio_file(source)
+                    for segment in self.transcriber.iter_transcribe(audio):
+                        segments.append(segment)
+                        yield segment
+
+                self.transcript_pdf_builder.build(stream(), transcript_pdf_path)
+                streamed.add("transcript_pdf")
+                return segments
+
+            return self.cache.fetch(
+                "transcript",
+                cache_keys(source)[0],
+                compute,
+                _encode_segments,
+                _decode_segments,
+                run_cache_stats,
+            )
+
+        scheduler.add(
+            "audio",
+            extract_audio,
+            audio_source,
+            resource="ffmpeg",
+            unit="audio_seconds",
+            count=_audio_seconds,
         )
-        frame_infos = self.extractor.extract_frames(
-            ingest_result.video_path, processed_dir / "frames"
+        scheduler.add(
+            "transcribe", transcribe, audio_source, "audio", resource="whisper", unit="segments"
         )
 
-        slides = self.slide_analyzer.analyze([(f.timestamp, f.path) for f in frame_infos])
-        transcript_segments = self.transcriber.transcribe(audio_path)
+        # Visual branch
+        def extract_frames(source: Path) -> List[FrameInfo]:
+            def compute() -> List[FrameInfo]:
+                return self.extractor.extract_frames(source, processed_dir / "frames")
+
+            if not cache_visual:
+                return compute()
+            frames_key = cache_keys(source)[1]
+            return self.cache.fetch(
+                "frames", frames_key, compute, _encode_frames, _decode_frames, run_cache_stats
+            )
+
+        def analyze(frames: List[FrameInfo], source: Path) -> List[SlideTextBlock]:
+            def compute() -> List[SlideTextBlock]:
+                slides: List[SlideTextBlock] = []
+                by_path = {frame.path: frame for frame in frames}
+                analysis = AnalysisStats()
 
-        slide_pdf = self.slide_pdf_builder.build(slides, processed_dir / "slides.pdf")
-        transcript_pdf = self.transcript_pdf_builder.build(
-            transcript_segments, processed_dir / "transcript.pdf"
+                def stream() -> Iterator[SlideTextBlock]:
+                    for block in self.slide_analyzer.iter_analyze(frames, analysis):
+                        slides.append(block)
+                        yield block
+                        # The page is drawn; later pages reuse the JPEG bytes,
+                        # so the raw frame no longer needs to stay in memory.
+                        if block.encoded:
+                            block.image = None
+                            by_path[block.frame_path].image = None
+
+                self.slide_pdf_builder.build(stream(), slide_pdf_path)
+                streamed.add("slide_pdf")
+                if self.slide_analyzer.captions_enabled:
+                    nested_metrics["captions"] = StageMetrics(
+                        "captions",
+                        sum(analysis.caption_batch_seconds),
+                        items=sum(1 for block in slides if block.caption),
+                        unit="slides",
+                    )
+                for frame in frames:
+                    frame.image = None
+                return slides
+
+            if not cache_visual:
+                return compute()
+            slides_key = cache_keys(source)[2]
+            return self.cache.fetch(
+                "slides", slides_key, compute, _encode_slides, _decode_slides, run_cache_stats
+            )
+
+        scheduler.add("frames", extract_frames, video_source, resource="ffmpeg", unit="frames")
+        scheduler.add(
+            "dedup", lambda frames: self._dedup(frames, processed_dir), "frames", unit="slides"
+        )
+        scheduler.add("analyze", analyze, "dedup", video_source, resource="ocr", unit="slides")
+
+        # Outputs
+        def slide_pdf(slides: List[SlideTextBlock]) -> Path:
+            if "slide_pdf" in streamed:
+                return slide_pdf_path
+            return self.slide_pdf_builder.build(slides, slide_pdf_path)
+
+        def transcript_pdf(segments: List[TranscriptSegment]) -> Path:
+            if "transcript_pdf" in streamed:
+                return transcript_pdf_path
+            return self.transcript_pdf_builder.build(segments, transcript_pdf_path)
+
+        def written_bytes(name: str) -> Callable[[Path], float | None]:
+            # A streamed PDF was written (and measured) by the stage feeding it.
+            return lambda path: None if name in streamed else _file_bytes(path)
+
+        scheduler.add(
+            "slide_pdf", slide_pdf, "analyze", unit="bytes", count=written_bytes("slide_pdf")
+        )
+        scheduler.add(
+            "transcript_pdf",
+            transcript_pdf,
+            "transcribe",
+            unit="bytes",
+            count=written_bytes("transcript_pdf"),
+        )
+        scheduler.add(
+            "align",
+            align_transcript,
+            "analyze",
+            "transcribe",
+            unit="segments",
+            count=lambda grouped: sum(len(segments) for segments in grouped),
+        )
+        scheduler.add(
+            "combined_pdf",
+            lambda slides, grouped: self.combined_pdf_builder.build(
+                slides, grouped, processed_dir / "combined.pdf"
+            ),
+            "analyze",
+            "align",
+            unit="bytes",
+            count=_file_bytes,
+        )
+        if pipeline_cfg.update_search_index:
+
+            def update_index(
+                slides: List[SlideTextBlock],
+                segments: List[TranscriptSegment],
+                grouped: List[List[TranscriptSegment]],
+                slide_pdf: Path,
+                combined_pdf: Path,
+            ) -> int:
+                return SearchIndex(self.settings).index_video(
+                    video_id, slides, segments, grouped, slide_pdf, combined_pdf
+                )
+
+            scheduler.add(
+                "index",
+                update_index,
+                "analyze",
+                "transcribe",
+                "align",
+                "slide_pdf",
+                "combined_pdf",
+                unit="entries",
+                count=lambda indexed: indexed,
+            )
+
+        if pipeline_cfg.update_vector_index:
+
+            def update_vectors(
+                slides: List[SlideTextBlock], grouped: List[List[TranscriptSegment]]
+            ) -> int:
+                chunks = iter_chunks(
+                    video_id,
+                    slides,
+                    grouped,
+                    slide_pdf_path,
+                    processed_dir / "combined.pdf",
+                    self.settings.vectors.chunk_seconds,
+                )
+                return VectorIndex(self.settings).index_video(video_id, chunks)
+
+            scheduler.add(
+                "vectors",
+                update_vectors,
+                "analyze",
+                "align",
+                unit="chunks",
+                count=lambda indexed: indexed,
+            )
+
+        results = scheduler.run()
+        critical_path = scheduler.critical_path()
+        console.log(
+            "[cyan]Critical path[/] "
+            + " -> ".join(
+                f"{name} ({scheduler.timings[name].duration:.1f}s)" for name in critical_path
+            )
+        )
+
+        stage_seconds = {name: t.duration for name, t in scheduler.timings.items()}
+        if ingest_result is not None:
+            stage_seconds = {"ingest": ingest_result.seconds, **stage_seconds}
+        metrics = {**scheduler.metrics, **nested_metrics}
+        if ingest_metrics is not None:
+            metrics = {"ingest": ingest_metrics, **metrics}
+        get_metrics_registry().observe(metrics.values())
+        cache_stats = run_cache_stats.to_dict()
+        metrics_path = write_metrics(
+            processed_dir / "metrics.json",
+            metrics.values(),
+            video_id=video_id,
+            critical_path=critical_path,
+            cache_stats=cache_stats,
+        )
+        return PipelineResult(
+            video_id,
+            results["slide_pdf"],
+            results["transcript_pdf"],
+            results["combined_pdf"],
+            stage_seconds=stage_seconds,
+            critical_path=critical_path,
+            cache_stats=cache_stats,
+            metrics=metrics,
+            metrics_path=metrics_path,
+        )
+
+    def _cache_keys(self, content_hash: str) -> tuple[str, str, str]:
+        extract = self.settings.extract
+        models = self.settings.models
+        transcript_cfg = {
+            "audio_sample_rate": extract.audio_sample_rate,
+            "whisper": models.model_dump(
+                include={
+                    "whisper_model",
+                    "whisper_language",
+                    "whisper_word_timestamps",
+                    "device",
+                    "whisper_workers",
+                    "whisper_chunk_seconds",
+                    "whisper_chunk_overlap_seconds",
+                }
+            ),
+        }
+        # Only settings that change which frames are extracted; audio settings
+        # and in_memory_frames (which bypasses the visual caches) are left out.
+        frames_cfg = extract.model_dump(
+            include={
+                "frame_strategy",
+                "frame_interval_seconds",
+                "interval_sampler",
+                "frame_max_width",
+                "scene_threshold",
+                "scene_sample_fps",
+                "scene_analysis_width",
+                "scene_edge_weight",
+                "scene_min_gap_seconds",
+            }
+        )
+        slides_cfg = {
+            "frames": frames_cfg,
+            # Slides are read from the deduplicated frames.
+            "dedup": extract.model_dump(
+                include={
+                    "dedup_frames",
+                    "dedup_hash_size",
+                    "dedup_max_hamming",
+                    "dedup_max_pixel_diff",
+                }
+            ),
+            "vision": models.model_dump(
+                include={
+                    "vlm_model",
+                    "ocr_lang",
+                    "ocr_min_score",
+                    "ocr_incremental",
+                    "ocr_region_max_fraction",
+                    "ocr_diff_threshold",
+                    "ocr_ignore_region",
+                    "device",
+                    "caption_max_new_tokens",
+                    "caption_skip_ocr_chars",
+                }
+            ),
+        }
+        return (
+            StageCache.key("transcript", content_hash, transcript_cfg),
+            StageCache.key("frames", content_hash, frames_cfg),
+            StageCache.key("slides", content_hash, slides_cfg),
+        )
+
+    def _dedup(self, frame_infos: List[FrameInfo], processed_dir: Path) -> List[FrameInfo]:
+        if not self.settings.extract.dedup_frames:
+            return frame_infos
+        kept = self.deduplicator.deduplicate(frame_infos, processed_dir / "frames" / "slides.json")
+        # Release the pixels of merged frames now rather than when the run ends;
+        # kept frames may be the very same objects (e.g. fewer than two frames).
+        kept_ids = {id(frame) for frame in kept}
+        for frame in frame_infos:
+            if id(frame) not in kept_ids:
+                frame.image = None
+        return kept
+
+
+def _count_items(value: Any) -> float | None:
+    return len(value) if isinstance(value, (list, tuple, dict)) else None
+
+
+def _file_bytes(path: Path) -> float | None:
+    return path.stat().st_size if path.exists() else None
+
+
+def _audio_seconds(audio: Path | np.ndarray | None) -> float | None:
+    if isinstance(audio, np.ndarray):
+        return len(audio) / WHISPER_SAMPLE_RATE
+    return None
+
+
+# region cache codecs
+def _encode_segments(segments: List[TranscriptSegment], _: Path) -> list:
+    return [
+        {
+            "text": s.text,
+            "start": s.start,
+            "end": s.end,
+            "words": [[w.text, w.start, w.end] for w in s.words],
+        }
+        for s in segments
+    ]
+
+
+def _decode_segments(data: list, _: Path) -> List[TranscriptSegment]:
+    return [
+        TranscriptSegment(
+            item["text"],
+            item["start"],
+            item["end"],
+            [TranscriptWord(*word) for word in item.get("words", [])],
         )
-        grouped = group_transcript_by_slide(slides, transcript_segments)
-        combined_pdf = self.combined_pdf_builder.build(
-            slides, grouped, processed_dir / "combined.pdf"
+        for item in data
+    ]
+
+
+def _encode_frames(frames: List[FrameInfo], entry: Path) -> list:
+    placed = link_or_copy((f.path for f in frames), entry / "frames")
+    return [
+        {"index": f.index, "timestamp": f.timestamp, "path": placed[f.path].name, "end": f.end}
+        for f in frames
+    ]
+
+
+def _decode_frames(data: list, entry: Path) -> List[FrameInfo] | None:
+    frames = [
+        FrameInfo(item["index"], item["timestamp"], entry / "frames" / item["path"], item["end"])
+        for item in data
+    ]
+    return frames if all(f.path.exists() for f in frames) else None
+
+
+def _encode_slides(slides: List[SlideTextBlock], entry: Path) -> list:
+    # The frames in processed_dir are rewritten by runs with other settings, so
+    # the entry keeps its own copies of the images its slide pages embed.
+    placed = link_or_copy((s.frame_path for s in slides), entry / "frames")
+    return [
+        {
+            "frame_path": placed[s.frame_path].name,
+            "timestamp": s.timestamp,
+            "text": s.text,
+            "caption": s.caption,
+            "end": s.end,
+            "lines": [[line.text, line.score, line.box] for line in s.lines],
+        }
+        for s in slides
+    ]
+
+
+def _decode_slides(data: list, entry: Path) -> List[SlideTextBlock] | None:
+    if any(Path(item["frame_path"]).is_absolute() for item in data):
+        # Older entries pointed into processed_dir, whose frames may have changed.
+        return None
+    slides = [
+        SlideTextBlock(
+            **{
+                **item,
+                "frame_path": entry / "frames" / item["frame_path"],
+                "lines": [
+                    OcrLine(text, score, tuple(box) if box else None)
+                    for text, score, box in item["lines"]
+                ],
+            }
         )
+        for item in data
+    ]
+    # Slide pages embed the frame images, so they must still be in the entry.
+    return slides if all(s.frame_path.exists() for s in slides) else None
 
-        return PipelineResult(video_id, slide_pdf, transcript_pdf, combined_pdf)
 
+# endregion
@@ -0,0 +1,201 @@
+"""In-process scene-change detection on downscaled frames."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+import cv2
+import numpy as np
+from rich.console import Console
+
+from .config import ExtractionConfig, Settings, resolve_settings
+
+console = Console()
+
+# Luma histogram resolution and the gradient magnitude that counts as an edge.
+_HIST_BINS = 32
+_EDGE_THRESHOLD = 48
+# A changed picture counts as settled once sample-to-sample motion drops
+# below this fraction of the scene threshold.
+_SETTLED_FRACTION = 0.5
+
+# Luma histograms and edge maps of one sample, each with a leading axis of 1.
+_Features = tuple[np.ndarray, np.ndarray]
+
+
+@dataclass
+class SceneScore:
+    """Change scores of one sampled frame.
+
+    ``score``, ``histogram`` and ``edges`` compare it with the current scene's
+    keyframe; ``motion`` is the score against the previous sample.
+    """
+
+    timestamp: float
+    score: float
+    histogram: float
+    edges: float
+    motion: float
+    # True for the frame captured as a slide image.
+    keyframe: bool = False
+
+
+class SceneDetector:
+    """Pick one settled keyframe per scene from a single decoding pass.
+
+    Sampled frames are reduced to small grayscale thumbnails and compared with
+    the current scene's keyframe by luma histogram distance and by the Jaccard
+    distance of their edge maps. Once a change crosses the threshold, the
+    detector waits for the picture to settle (low motion between samples) so
+    fades and builds are not captured half-way, and reports the change's start.
+    """
+
+    def __init__(self, settings: Settings | None = None) -> None:
+        self.settings = settings or resolve_settings()
+        self.extract_cfg: ExtractionConfig = self.settings.extract
+        # Per-sample scores of the most recent detect() call.
+        self.scores: List[SceneScore] = []
+
+    def detect(self, video: Path) -> Iterator[tuple[float, np.ndarray]]:
+        """Yield ``(scene start seconds, full-resolution BGR frame)`` per scene."""
+        cfg = self.extract_cfg
+        cap = cv2.VideoCapture(str(video))
+        if not cap.isOpened():
+            msg = f"Unable to open video: {video}"
+            raise FileNotFoundError(msg)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25
+        step = max(round(fps / cfg.scene_sample_fps), 1)
+        self.scores = []
+
+        reference: _Features | None = None
+        previous: _Features | None = None
+        pending: float | None = None
+        last_start = float("-inf")
+        last_frame: np.ndarray | None = None
+        idx = -1
+        try:
+            while cap.grab():
+                idx += 1
+                if idx % step:
+                    continue
+                success, frame = cap.retrieve()
+                if not success:
+                    break
+                timestamp = _position_seconds(cap, idx, fps)
+                thumb = self._thumbnail(frame)[None]
+                features = (luma_histograms(thumb), edge_maps(thumb))
+                last_frame = frame
+
+                if reference is None or previous is None:
+                    self.scores.append(SceneScore(timestamp, 1.0, 1.0, 1.0, 1.0, keyframe=True))
+                    reference = previous = features
+                    last_start = timestamp
+                    yield timestamp, frame
+                    continue
+
+                # Change is measured against the current scene's keyframe, so
+                # gradual transitions accumulate instead of being split across
+                # samples; motion against the previous sample tells when the
+                # picture has settled.
+                score, hist, edges = self._change(reference, features)
+                motion = self._change(previous, features)[0]
+                entry = SceneScore(timestamp, score, hist, edges, motion)
+                self.scores.append(entry)
+                previous = features
+
+                if pending is None:
+                    changed = score > cfg.scene_threshold
+                    if changed and timestamp - last_start >= cfg.scene_min_gap_seconds:
+                        pending = timestamp
+                    continue
+                settled = motion <= cfg.scene_threshold * _SETTLED_FRACTION
+                if settled or timestamp - pending >= cfg.scene_min_gap_seconds:
+                    entry.keyframe = True
+                    reference = features
+                    last_start, pending = pending, None
+                    yield last_start, frame
+            if pending is not None and last_frame is not None:
+                self.scores[-1].keyframe = True
+                yield pending, last_frame
+        finally:
+            cap.release()
+        selected = sum(entry.keyframe for entry in self.scores)
+        console.log(f"[cyan]Scene detection[/] {selected} scenes from {len(self.scores)} samples")
+
+    def _change(self, before: _Features, after: _Features) -> tuple[float, float, float]:
+        """Return ``(score, histogram distance, edge distance)`` between two samples."""
+        hist = float(histogram_distance(before[0], after[0])[0])
+        edges = float(edge_distance(before[1], after[1])[0])
+        return max(hist, self.extract_cfg.scene_edge_weight * edges), hist, edges
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        width = self.extract_cfg.scene_analysis_width
+        height = max(round(frame.shape[0] * width / frame.shape[1]), 2)
+        # Resizing first keeps the colour conversion on the small image.
+        small = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+
+def luma_histograms(thumbs: np.ndarray, bins: int = _HIST_BINS) -> np.ndarray:
+    """Normalized histograms of a ``(N, H, W)`` uint8 stack, shape ``(N, bins)``."""
+    n = thumbs.shape[0]
+    binned = thumbs.reshape(n, -1).astype(np.int64) * bins // 256
+    # Offset each frame's bins so one bincount covers the whole stack.
+    binned += (np.arange(n) * bins)[:, None]
+    counts = np.bincount(binned.ravel(), minlength=n * bins).reshape(n, bins)
+    return counts / thumbs[0].size
+
+
+def edge_maps(thumbs: np.ndarray, threshold: int = _EDGE_THRESHOLD) -> np.ndarray:
+    """Boolean edge maps of a ``(N, H, W)`` stack at half resolution.
+
+    Edges are thresholded forward differences; 2x2 max-pooling absorbs the
+    one-pixel jitter that compression adds between otherwise identical frames.
+    """
+    pixels = thumbs.astype(np.int16)
+    gx = np.abs(np.diff(pixels, axis=2))[:, :-1, :]
+    gy = np.abs(np.diff(pixels, axis=1))[:, :, :-1]
+    edges = (gx + gy) > threshold
+    n, h, w = edges.shape
+    h, w = h // 2 * 2, w // 2 * 2
+    return edges[:, :h, :w].reshape(n, h // 2, 2, w // 2, 2).any(axis=(2, 4))
+
+
+def histogram_distance(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Half the L1 distance between normalized histograms, in [0, 1]."""
+    return np.abs(a - b).sum(axis=-1) / 2
+
+
+def edge_distance(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Jaccard distance between edge maps, in [0, 1]; 0 when both are empty."""
+    inter = np.logical_and(a, b).sum(axis=(-2, -1))
+    union = np.logical_or(a, b).sum(axis=(-2, -1))
+    return np.where(union > 0, 1 - inter / np.maximum(union, 1), 0.0)
+
+
+def write_scene_scores(path: Path, scores: Iterable[SceneScore]) -> None:
+    """Persist per-sample change scores for threshold tuning."""
+    path.write_text(json.dumps([asdict(entry) for entry in scores], indent=2))
+
+
+def _position_seconds(cap: cv2.VideoCapture, index: int, fps: float) -> float:
+    # Container timestamps stay exact for variable frame rate video; fall back
+    # to the nominal rate when the backend does not report them.
+    msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+    if msec > 0 or index == 0:
+        return msec / 1000
+    return index / fps
+
+
+__all__ = [
+    "SceneDetector",
+    "SceneScore",
+    "luma_histograms",
+    "edge_maps",
+    "histogram_distance",
+    "edge_distance",
+    "write_scene_scores",
+]
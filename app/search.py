@@ -0,0 +1,169 @@
+"""Full-text search over slide text and transcripts of processed videos."""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Sequence
+
+from .config import Settings, resolve_settings
+from .models.audio import TranscriptSegment
+from .models.vision import SlideTextBlock
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries USING fts5(
+    text,
+    video_id UNINDEXED,
+    kind UNINDEXED,
+    start UNINDEXED,
+    end UNINDEXED,
+    pdf UNINDEXED,
+    page UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    entries INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class SearchHit:
+    """A ranked match pointing at a moment in a video and a page in its PDFs."""
+
+    video_id: str
+    kind: str
+    text: str
+    start: float
+    end: float | None
+    pdf: str
+    page: int
+    score: float
+
+
+class SearchIndex:
+    """SQLite FTS5 index, updated per video after each pipeline run."""
+
+    def __init__(self, settings: Settings | None = None, db_path: Path | None = None) -> None:
+        self.settings = settings or resolve_settings()
+        self.db_path = db_path or self.settings.paths.search_db
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            try:
+                conn.executescript(_SCHEMA)
+            except sqlite3.OperationalError as exc:  # pragma: no cover - build specific
+                msg = "SQLite FTS5 support is required for the search index"
+                raise RuntimeError(msg) from exc
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def index_video(
+        self,
+        video_id: str,
+        slides: Sequence[SlideTextBlock],
+        transcript: Sequence[TranscriptSegment],
+        grouped_transcript: Sequence[List[TranscriptSegment]],
+        slide_pdf: Path,
+        combined_pdf: Path,
+    ) -> int:
+        """Replace the entries of ``video_id``; returns the number indexed.
+
+        Slide ``i`` is page ``i + 1`` of both the slide and the combined PDF;
+        transcript hits are the per-slide pieces of ``grouped_transcript`` and
+        point at their slide's combined-PDF page.
+        """
+        rows = []
+        for page, slide in enumerate(slides, start=1):
+            text = "\n".join(filter(None, [slide.text, slide.caption]))
+            rows.append(
+                (text, video_id, "slide", slide.timestamp, slide.end, str(slide_pdf), page)
+            )
+        pages = [
+            (page, segment)
+            for page, group in enumerate(grouped_transcript, start=1)
+            for segment in group
+        ]
+        if not slides:
+            pages = [(1, segment) for segment in transcript]
+        for page, segment in pages:
+            rows.append(
+                (
+                    segment.text,
+                    video_id,
+                    "transcript",
+                    segment.start,
+                    segment.end,
+                    str(combined_pdf),
+                    page,
+                )
+            )
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE video_id = ?", (video_id,))
+            conn.executemany(
+                "INSERT INTO entries (text, video_id, kind, start, end, pdf, page) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO videos (video_id, entries, indexed_at) VALUES (?, ?, ?)",
+                (video_id, len(rows), time.time()),
+            )
+        return len(rows)
+
+    def remove_video(self, video_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE video_id = ?", (video_id,))
+            conn.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
+
+    def search(self, query: str, limit: int = 20, video_id: str | None = None) -> List[SearchHit]:
+        match = _to_match_expression(query)
+        if not match:
+            return []
+        sql = (
+            "SELECT video_id, kind, snippet(entries, 0, '[', ']', '…', 16), start, end, pdf, "
+            "page, bm25(entries) AS score FROM entries WHERE entries MATCH ?"
+        )
+        params: list = [match]
+        if video_id is not None:
+            sql += " AND video_id = ?"
+            params.append(video_id)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [
+            SearchHit(
+                video_id=row[0],
+                kind=row[1],
+                text=row[2],
+                start=float(row[3]),
+                end=float(row[4]) if row[4] is not None else None,
+                pdf=row[5],
+                page=int(row[6]),
+                # bm25() is lower-is-better; flip it so higher scores rank first.
+                score=-float(row[7]),
+            )
+            for row in rows
+        ]
+
+
+def _to_match_expression(query: str) -> str:
+    """Quote each term so user input is never parsed as FTS5 query syntax."""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"' for term in terms if term)
+
+
+__all__ = ["SearchIndex", "SearchHit"]
@@ -2,17 +2,39 @@
 
 from __future__ import annotations
 
-import asyncio
-from pathlib import Path
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List
 
-from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
 from .config import IngestRequest, resolve_settings
+from .jobs import Job, JobQueue
+from .metrics import gauge_lines, get_metrics_registry
+from .models import get_model_manager
 from .pipeline import PipelineResult, PipelineRunner
+from .search import SearchIndex
+from .vectors import VectorIndex
 
-app = FastAPI(title="Video Lectures to Searchable PDFs")
+settings = resolve_settings()
+runner = PipelineRunner(settings)
+jobs = JobQueue(runner, settings)
+search_index = SearchIndex(settings)
+vector_index = VectorIndex(settings)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    jobs.start()
+    yield
+    jobs.stop(timeout=5)
+    # Chunked transcription keeps worker processes resident; stop them with the server.
+    runner.transcriber.close()
+
+
+app = FastAPI(title="Video Lectures to Searchable PDFs", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -20,14 +42,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-runner = PipelineRunner(resolve_settings())
-
 
 class PipelineResponse(BaseModel):
     video_id: str
     slide_pdf: str
     transcript_pdf: str
     combined_pdf: str
+    # Per-stage wall/CPU time, peak RSS, item counts and throughput.
+    metrics: Dict[str, Dict[str, Any]] = {}
 
     @classmethod
     def from_result(cls, result: PipelineResult) -> "PipelineResponse":
@@ -36,14 +58,110 @@ class PipelineResponse(BaseModel):
             slide_pdf=str(result.slide_pdf),
             transcript_pdf=str(result.transcript_pdf),
             combined_pdf=str(result.combined_pdf),
+            metrics={name: m.to_dict() for name, m in result.metrics.items()},
+        )
+
+
+class SearchHitResponse(BaseModel):
+    video_id: str
+    kind: str
+    text: str
+    start: float
+    end: float | None
+    pdf: str
+    page: int
+    score: float
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    request: Dict[str, Any]
+    stages: Dict[str, str]
+    result: PipelineResponse | None = None
+    error: str | None = None
+    cancel_requested: bool = False
+    created_at: float
+    updated_at: float
+
+    @classmethod
+    def from_job(cls, job: Job) -> "JobResponse":
+        return cls(
+            job_id=job.id,
+            status=job.status,
+            request=job.request,
+            stages=job.stages,
+            result=PipelineResponse(**job.result) if job.result else None,
+            error=job.error,
+            cancel_requested=job.cancel_requested,
+            created_at=job.created_at,
+            updated_at=job.updated_at,
         )
 
 
 @app.post("/process", response_model=PipelineResponse)
 def process(request: IngestRequest) -> PipelineResponse:
+    """Run the pipeline synchronously; prefer ``POST /jobs`` for long videos."""
     try:
         result = runner.run(request)
     except Exception as exc:  # pragma: no cover - API error path
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     return PipelineResponse.from_result(result)
 
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+def submit_job(request: IngestRequest) -> JobResponse:
+    return JobResponse.from_job(jobs.submit(request))
+
+
+@app.get("/jobs", response_model=List[JobResponse])
+def list_jobs(limit: int = 50) -> List[JobResponse]:
+    return [JobResponse.from_job(job) for job in jobs.store.recent(limit)]
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(job_id: str) -> JobResponse:
+    job = jobs.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse.from_job(job)
+
+
+@app.delete("/jobs/{job_id}", response_model=JobResponse)
+def cancel_job(job_id: str) -> JobResponse:
+    job = jobs.store.request_cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse.from_job(job)
+
+
+@app.get("/search", response_model=List[SearchHitResponse])
+def search(
+    q: str, limit: int = 20, video_id: str | None = None, semantic: bool = False
+) -> List[SearchHitResponse]:
+    """Ranked slide/transcript hits with video id, timestamp and PDF page.
+
+    ``semantic`` ranks chunks of the vector index by similarity instead of
+    matching words in the full-text index.
+    """
+    index = vector_index if semantic else search_index
+    try:
+        hits = index.search(q, limit=limit, video_id=video_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return [SearchHitResponse(**vars(hit)) for hit in hits]
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Stage histograms of completed runs and job counts, in Prometheus text format."""
+    lines = gauge_lines("vlsp_jobs", "Jobs by status.", "status", jobs.store.counts())
+    body = get_metrics_registry().render() + "\n".join(lines) + "\n"
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
+@app.get("/models")
+def resident_models() -> Dict[str, Any]:
+    """Models currently loaded in this process and their estimated memory."""
+    manager = get_model_manager(settings.models)
+    return {"resident_bytes": manager.resident_bytes(), "models": manager.report()}
@@ -2,32 +2,95 @@
 
 from __future__ import annotations
 
-from bisect import bisect_right
 from typing import Dict, List, Sequence
 
-from .models.audio import TranscriptSegment
+import numpy as np
+
+from .models.audio import TranscriptSegment, TranscriptWord
 from .models.vision import SlideTextBlock
 
 
-def group_transcript_by_slide(
+def align_transcript(
     slides: Sequence[SlideTextBlock],
     transcript: Sequence[TranscriptSegment],
-) -> Dict[str, List[TranscriptSegment]]:
-    """Assign transcript segments to the slide active at their midpoint."""
+) -> List[List[TranscriptSegment]]:
+    """Split the transcript at slide changes; group ``i`` is what was said on slide ``i``.
 
+    Every word goes to the slide active at its midpoint, and the words of one
+    segment that land on the same slide stay together as one segment (the
+    original object when nothing was split off). Segments without word timings
+    have them interpolated over the segment by character count.
+    """
     if not slides:
-        return {}
+        return []
+    groups: List[List[TranscriptSegment]] = [[] for _ in slides]
+    texts, starts, ends, owners, firsts = _flatten_words(transcript)
+    if not texts:
+        return groups
+
+    slide_times = np.fromiter((slide.timestamp for slide in slides), float, len(slides))
+    order = np.argsort(slide_times, kind="stable")
+    position = np.searchsorted(slide_times[order], (starts + ends) / 2, side="right") - 1
+    slide_of = order[np.clip(position, 0, len(slides) - 1)]
 
-    slide_times = [slide.timestamp for slide in slides]
-    buckets: Dict[str, List[TranscriptSegment]] = {
-        str(slide.frame_path): [] for slide in slides
-    }
+    # A piece ends wherever the owning segment or the slide changes.
+    breaks = np.flatnonzero((np.diff(owners) != 0) | (np.diff(slide_of) != 0)) + 1
+    bounds = np.concatenate(([0], breaks, [len(texts)])).tolist()
+    owner_list = owners.tolist()
+    slide_list = slide_of.tolist()
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        owner = owner_list[lo]
+        segment = transcript[owner]
+        first, last = firsts[owner], firsts[owner + 1]
+        if lo == first and hi == last:
+            piece = segment
+        else:
+            words = segment.words[lo - first : hi - first] if segment.words else []
+            piece = TranscriptSegment(
+                " ".join(texts[lo:hi]), float(starts[lo]), float(ends[hi - 1]), words
+            )
+        groups[slide_list[lo]].append(piece)
+    return groups
 
+
+def _flatten_words(
+    transcript: Sequence[TranscriptSegment],
+) -> tuple[List[str], np.ndarray, np.ndarray, np.ndarray, List[int]]:
+    """Word texts, start/end times and owning segment index, plus each segment's first word."""
+    words: List[TranscriptWord] = []
+    counts: List[int] = []
     for segment in transcript:
-        midpoint = (segment.start + segment.end) / 2
-        idx = bisect_right(slide_times, midpoint) - 1
-        idx = max(0, min(idx, len(slides) - 1))
-        key = str(slides[idx].frame_path)
-        buckets.setdefault(key, []).append(segment)
-    return buckets
+        segment_words = segment.words or _interpolated_words(segment)
+        words.extend(segment_words)
+        counts.append(len(segment_words))
+    count = len(words)
+    starts = np.fromiter((word.start for word in words), float, count)
+    ends = np.fromiter((word.end for word in words), float, count)
+    owners = np.repeat(np.arange(len(counts)), counts)
+    firsts = np.concatenate(([0], np.cumsum(counts))).tolist()
+    return [word.text for word in words], starts, ends, owners, firsts
+
 
+def _interpolated_words(segment: TranscriptSegment) -> List[TranscriptWord]:
+    """Spread the segment's duration over its words in proportion to their length."""
+    tokens = segment.text.split()
+    if not tokens:
+        return []
+    weights = np.cumsum([len(token) + 1 for token in tokens], dtype=float)
+    fractions = np.concatenate(([0.0], weights / weights[-1]))
+    edges = (segment.start + (segment.end - segment.start) * fractions).tolist()
+    return [TranscriptWord(token, edges[k], edges[k + 1]) for k, token in enumerate(tokens)]
+
+
+def group_transcript_by_slide(
+    slides: Sequence[SlideTextBlock],
+    transcript: Sequence[TranscriptSegment],
+) -> Dict[str, List[TranscriptSegment]]:
+    """:func:`align_transcript` keyed by ``str(frame_path)``.
+
+    Slides that share a frame path share a bucket.
+    """
+    buckets: Dict[str, List[TranscriptSegment]] = {}
+    for slide, group in zip(slides, align_transcript(slides, transcript)):
+        buckets.setdefault(str(slide.frame_path), []).extend(group)
+    return buckets
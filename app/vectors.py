@@ -0,0 +1,329 @@
+"""Chunked embeddings of slides and transcripts in an on-disk vector index."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import time
+import zlib
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Protocol, Sequence
+
+import numpy as np
+from rich.console import Console
+
+from .config import Settings, VectorConfig, resolve_settings
+from .models.audio import TranscriptSegment
+from .models.registry import ModelManager, get_model_manager
+from .models.vision import SlideTextBlock
+from .search import SearchHit
+
+console = Console()
+
+_TOKEN = re.compile(r"\w+")
+
+
+@dataclass
+class TextChunk:
+    """A slide's text, or a time window of what was said while it was shown."""
+
+    video_id: str
+    kind: str  # "slide" or "transcript"
+    text: str
+    start: float
+    end: float | None
+    pdf: str
+    page: int
+
+
+def iter_chunks(
+    video_id: str,
+    slides: Sequence[SlideTextBlock],
+    grouped_transcript: Sequence[List[TranscriptSegment]],
+    slide_pdf: Path,
+    combined_pdf: Path,
+    window_seconds: float = 60.0,
+) -> Iterator[TextChunk]:
+    """Yield one chunk per slide and its transcript merged into windows of ``window_seconds``.
+
+    Transcript windows never cross a slide change, so each chunk points at one
+    page (of the combined PDF, like transcript search hits).
+    """
+    for page, slide in enumerate(slides, start=1):
+        text = "\n".join(filter(None, [slide.text, slide.caption]))
+        if text:
+            yield TextChunk(
+                video_id, "slide", text, slide.timestamp, slide.end, str(slide_pdf), page
+            )
+        group = grouped_transcript[page - 1] if page <= len(grouped_transcript) else []
+        window: List[TranscriptSegment] = []
+        for segment in group:
+            if window and segment.end - window[0].start > window_seconds:
+                yield _transcript_chunk(video_id, window, combined_pdf, page)
+                window = []
+            window.append(segment)
+        if window:
+            yield _transcript_chunk(video_id, window, combined_pdf, page)
+
+
+def _transcript_chunk(
+    video_id: str, segments: List[TranscriptSegment], pdf: Path, page: int
+) -> TextChunk:
+    text = " ".join(segment.text for segment in segments)
+    return TextChunk(
+        video_id, "transcript", text, segments[0].start, segments[-1].end, str(pdf), page
+    )
+
+
+# region embedders
+class Embedder(Protocol):
+    """Maps texts to L2-normalized float32 vectors.
+
+    ``signature`` identifies the model and its settings; vectors are only
+    comparable between identical signatures.
+    """
+
+    signature: str
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray: ...
+
+
+class HashingEmbedder:
+    """Signed feature hashing of words and word pairs with sublinear term frequency.
+
+    Needs no model, vocabulary or network, and a text's vector never depends on
+    the rest of the corpus, so indexing one lecture leaves the others untouched.
+    """
+
+    def __init__(self, dim: int = 1024) -> None:
+        self.dim = dim
+        self.signature = f"hashing-v1:{dim}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN.findall(text.lower())
+            features = Counter(tokens)
+            features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+            for feature, count in features.items():
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                vectors[row, digest % self.dim] += sign * (1.0 + math.log(count))
+        return _normalize(vectors)
+
+
+class LangChainEmbedder:
+    """Adapter for a LangChain ``Embeddings`` model, loaded on first use through the model manager."""
+
+    def __init__(
+        self, name: str, loader: Callable[[], Any], models: ModelManager | None = None
+    ) -> None:
+        self.name = name
+        self.signature = f"langchain:{name}"
+        self._loader = loader
+        self.models = models or get_model_manager()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        with self.models.acquire(
+            ("embedder", self.name), f"embedder:{self.name}", self._loader
+        ) as model:
+            vectors = np.asarray(model.embed_documents(list(texts)), dtype=np.float32)
+        return _normalize(vectors)
+
+
+def get_embedder(cfg: VectorConfig, models: ModelManager | None = None) -> Embedder:
+    """``hashing`` or ``hf:<sentence-transformers model>``."""
+    if cfg.embedder == "hashing":
+        return HashingEmbedder(cfg.hashing_dim)
+    if cfg.embedder.startswith("hf:"):
+        model_name = cfg.embedder[len("hf:") :]
+
+        def load() -> Any:
+            from langchain.embeddings import HuggingFaceEmbeddings
+
+            return HuggingFaceEmbeddings(model_name=model_name)
+
+        return LangChainEmbedder(model_name, load, models)
+    msg = f"Unknown embedder {cfg.embedder!r}; use 'hashing' or 'hf:<model name>'"
+    raise ValueError(msg)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+# endregion
+
+
+class VectorIndex:
+    """Per-video shards of chunk vectors under ``paths.vector_dir``.
+
+    Each video has its own directory (``vectors.npy``, ``chunks.json`` and
+    ``meta.json``), so indexing a lecture rewrites only that lecture's shard,
+    and is skipped entirely when its chunks and embedder are unchanged. Shards
+    embedded with a different embedder are ignored by :meth:`search` until the
+    video is indexed again.
+    """
+
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        embedder: Embedder | None = None,
+        root: Path | None = None,
+    ) -> None:
+        self.settings = settings or resolve_settings()
+        self.embedder = embedder or get_embedder(self.settings.vectors)
+        self.root = root or self.settings.paths.vector_dir
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Loaded shards by video id, with the meta.json mtime they were read at.
+        self._shards: Dict[str, tuple[float, np.ndarray, List[Dict[str, Any]]]] = {}
+
+    def index_video(self, video_id: str, chunks: Iterable[TextChunk], batch_size: int = 64) -> int:
+        """Embed and store the chunks of ``video_id``, replacing its previous shard."""
+        records = [asdict(chunk) for chunk in chunks]
+        digest = hashlib.sha256(
+            json.dumps([self.embedder.signature, records], sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        shard = self._shard_dir(video_id)
+        meta = _read_json(shard / "meta.json")
+        if meta and meta.get("digest") == digest:
+            console.log(f"[cyan]Vector index[/] {video_id} unchanged ({len(records)} chunks)")
+            return len(records)
+
+        texts = [record["text"] for record in records]
+        parts = [
+            self.embedder.embed(texts[start : start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ]
+        vectors = np.concatenate(parts) if parts else np.zeros((0, 0), dtype=np.float32)
+
+        # Write the new shard next to the old one and swap it in.
+        staging = self.root / f".{video_id}.{os.getpid()}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir()
+        np.save(staging / "vectors.npy", vectors)
+        (staging / "chunks.json").write_text(json.dumps(records), encoding="utf-8")
+        (staging / "meta.json").write_text(
+            json.dumps(
+                {
+                    "video_id": video_id,
+                    "signature": self.embedder.signature,
+                    "digest": digest,
+                    "chunks": len(records),
+                    "indexed_at": time.time(),
+                }
+            ),
+            encoding="utf-8",
+        )
+        shutil.rmtree(shard, ignore_errors=True)
+        staging.rename(shard)
+        self._shards.pop(video_id, None)
+        console.log(f"[cyan]Vector index[/] {video_id}: {len(records)} chunks embedded")
+        return len(records)
+
+    def remove_video(self, video_id: str) -> None:
+        shutil.rmtree(self._shard_dir(video_id), ignore_errors=True)
+        self._shards.pop(video_id, None)
+
+    def videos(self) -> List[str]:
+        # Dot-prefixed directories are shards still being written.
+        return sorted(
+            p.name
+            for p in self.root.iterdir()
+            if not p.name.startswith(".") and (p / "meta.json").exists()
+        )
+
+    def search(self, query: str, limit: int = 20, video_id: str | None = None) -> List[SearchHit]:
+        """Chunks most similar to ``query`` (cosine similarity), best first.
+
+        Chunks sharing no features with the query (score <= 0) are not hits.
+        """
+        query_vector = self.embedder.embed([query])[0]
+        candidates: List[tuple[float, Dict[str, Any]]] = []
+        for vid in [video_id] if video_id else self.videos():
+            loaded = self._load(vid)
+            if loaded is None:
+                continue
+            vectors, records = loaded
+            scores = vectors @ query_vector
+            top = (
+                np.argpartition(-scores, limit)[:limit]
+                if len(scores) > limit
+                else range(len(scores))
+            )
+            candidates.extend((float(scores[idx]), records[idx]) for idx in top if scores[idx] > 0)
+        candidates.sort(key=lambda item: item[0], reverse=True)
+        return [
+            SearchHit(
+                video_id=record["video_id"],
+                kind=record["kind"],
+                text=record["text"],
+                start=record["start"],
+                end=record["end"],
+                pdf=record["pdf"],
+                page=record["page"],
+                score=score,
+            )
+            for score, record in candidates[:limit]
+        ]
+
+    def _shard_dir(self, video_id: str) -> Path:
+        # Ids reach here from HTTP queries; they must name a directory under root
+        # that is not a dot-prefixed staging directory.
+        if (
+            not video_id
+            or video_id.startswith(".")
+            or ".." in video_id
+            or any(c in video_id for c in "/\\")
+        ):
+            msg = f"Invalid video id {video_id!r}"
+            raise ValueError(msg)
+        return self.root / video_id
+
+    def _load(self, video_id: str) -> tuple[np.ndarray, List[Dict[str, Any]]] | None:
+        shard = self._shard_dir(video_id)
+        try:
+            mtime = (shard / "meta.json").stat().st_mtime
+        except FileNotFoundError:
+            return None
+        cached = self._shards.get(video_id)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
+        meta = _read_json(shard / "meta.json")
+        if not meta or meta.get("signature") != self.embedder.signature or not meta["chunks"]:
+            if meta and meta.get("signature") != self.embedder.signature:
+                console.log(
+                    f"[yellow]Skipping {video_id}: embedded with {meta.get('signature')}[/]"
+                )
+            return None
+        vectors = np.load(shard / "vectors.npy", mmap_mode="r")
+        records = json.loads((shard / "chunks.json").read_text(encoding="utf-8"))
+        self._shards[video_id] = (mtime, vectors, records)
+        return vectors, records
+
+
+def _read_json(path: Path) -> Dict[str, Any] | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+__all__ = [
+    "TextChunk",
+    "iter_chunks",
+    "Embedder",
+    "HashingEmbedder",
+    "LangChainEmbedder",
+    "get_embedder",
+    "VectorIndex",
+]
@@ -0,0 +1,507 @@
+"""End-to-end pipeline benchmark on a synthetic lecture.
+
+Renders a slide video (OpenCV) and a speech-like audio track of configurable
+length, then runs frame extraction, deduplication, OCR, transcription,
+transcript alignment and the three PDF builders, recording wall time and peak
+memory per stage. OCR and Whisper are replaced by cheap
+deterministic stubs unless ``--real-models`` is given, so the numbers reflect
+the pipeline's own overhead and run offline. Results are written as JSON; with
+``--baseline`` the run is compared against an earlier result and exits with
+code 1 when a stage slowed down or grew by more than ``--max-slowdown``.
+
+    python benchmarks/pipeline.py --minutes 10 --output bench.json
+    python benchmarks/pipeline.py --minutes 10 --baseline bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Iterator
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.config import Settings, StoragePaths  # noqa: E402
+from app.dedup import FrameDeduplicator  # noqa: E402
+from app.media import MediaExtractor  # noqa: E402
+from app.metrics import RssSampler  # noqa: E402
+from app.models.audio import WHISPER_SAMPLE_RATE, WhisperTranscriber  # noqa: E402
+from app.models.registry import ModelManager, current_rss_bytes  # noqa: E402
+from app.models.vision import AnalysisStats, SlideAnalyzer  # noqa: E402
+from app.pdf.combined import CombinedPdfBuilder  # noqa: E402
+from app.pdf.slides import SlidePdfBuilder  # noqa: E402
+from app.pdf.transcript import TranscriptPdfBuilder  # noqa: E402
+from app.sync import align_transcript  # noqa: E402
+
+WORDS = (
+    "gradient descent loss function neural network layer activation softmax entropy "
+    "bias variance regularization dropout batch norm convolution pooling kernel stride "
+    "padding attention embedding optimizer momentum learning rate schedule"
+).split()
+
+# Stage timings below this many seconds are too noisy to flag as regressions.
+_NOISE_FLOOR_SECONDS = 0.05
+
+
+# region synthetic lecture
+def slide_text(index: int) -> tuple[str, list[str]]:
+    """Title and bullet lines of synthetic slide ``index``."""
+    rng = np.random.default_rng(index)
+    title = " ".join(rng.choice(WORDS, 2)).title()
+    bullets = [
+        "- " + " ".join(rng.choice(WORDS, int(rng.integers(2, 5))))
+        for _ in range(int(rng.integers(2, 7)))
+    ]
+    return title, bullets
+
+
+def render_slide(index: int, size: tuple[int, int], shown: int | None = None) -> np.ndarray:
+    """Draw the slide with only its first ``shown`` bullets (all by default)."""
+    width, height = size
+    scale = width / 1280
+    image = np.full((height, width, 3), 245, np.uint8)
+    title, bullets = slide_text(index)
+    cv2.putText(
+        image,
+        title,
+        (int(80 * scale), int(120 * scale)),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        2.5 * scale,
+        (20, 20, 20),
+        max(int(5 * scale), 1),
+    )
+    for line, bullet in enumerate(bullets[:shown]):
+        cv2.putText(
+            image,
+            bullet,
+            (int(100 * scale), int((230 + line * 75) * scale)),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1.4 * scale,
+            (40, 40, 40),
+            max(int(3 * scale), 1),
+        )
+    return image
+
+
+def write_video(
+    path: Path,
+    seconds: float,
+    slide_seconds: float,
+    fps: int,
+    size: tuple[int, int],
+    seed: int,
+    reveal: bool = False,
+) -> list[float]:
+    """Write a slide deck video with short cross-fades; returns the slide start times.
+
+    With ``reveal`` each slide's bullets appear one at a time, every step
+    counting as a slide.
+    """
+    rng = np.random.default_rng(seed)
+    # A few precomputed noise patterns stand in for compression/sensor noise.
+    noise = [rng.integers(-3, 4, (size[1], size[0], 3), dtype=np.int16) for _ in range(4)]
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    total = int(seconds * fps)
+    fade = max(fps // 2, 1)
+    changes: list[float] = []
+    written = 0
+    index = 0
+    previous: np.ndarray | None = None
+    while written < total:
+        number = seed * 100_000 + index
+        steps = range(1, len(slide_text(number)[1]) + 1) if reveal else [None]
+        duration = int(fps * rng.uniform(0.5, 1.5) * slide_seconds / len(steps))
+        for shown in steps:
+            slide = render_slide(number, size, shown)
+            if previous is not None:
+                for step in range(min(fade, total - written)):
+                    writer.write(cv2.addWeighted(previous, 1 - step / fade, slide, step / fade, 0))
+                    written += 1
+            changes.append(written / fps)
+            base = slide.astype(np.int16)
+            for step in range(min(duration, total - written)):
+                writer.write(np.clip(base + noise[step % len(noise)], 0, 255).astype(np.uint8))
+                written += 1
+            previous = slide
+        index += 1
+    writer.release()
+    return changes
+
+
+def synthetic_speech(seconds: float, seed: int) -> np.ndarray:
+    """Mono float32 at Whisper's rate: modulated tone 'utterances' between short pauses."""
+    rng = np.random.default_rng(seed)
+    total = int(seconds * WHISPER_SAMPLE_RATE)
+    samples = rng.normal(0, 0.002, total).astype(np.float32)
+    position = 0
+    while position < total:
+        length = int(rng.uniform(1.5, 7.0) * WHISPER_SAMPLE_RATE)
+        end = min(position + length, total)
+        t = np.arange(end - position, dtype=np.float32) / WHISPER_SAMPLE_RATE
+        pitch = rng.uniform(110, 220)
+        envelope = 0.6 + 0.4 * np.sin(2 * np.pi * rng.uniform(2, 5) * t)
+        samples[position:end] += 0.3 * envelope * np.sin(2 * np.pi * pitch * t)
+        position = end + int(rng.uniform(0.2, 0.9) * WHISPER_SAMPLE_RATE)
+    return samples
+
+
+def write_wav(path: Path, samples: np.ndarray) -> None:
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(WHISPER_SAMPLE_RATE)
+        handle.writeframes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+
+
+def read_wav(path: Path) -> np.ndarray:
+    with wave.open(str(path), "rb") as handle:
+        pcm = np.frombuffer(handle.readframes(handle.getnframes()), dtype=np.int16)
+    return pcm.astype(np.float32) / 32768
+
+
+# endregion
+# region stub models
+class StubOcrEngine:
+    """PaddleOCR 2.x-shaped engine that reports one line per band of dark rows.
+
+    A line's words depend only on its own pixels, so reading a crop gives the
+    same text as reading the whole frame.
+    """
+
+    def ocr(self, item: np.ndarray | str, cls: bool = True) -> list:
+        image = cv2.imread(item) if isinstance(item, str) else item
+        dark = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) < 128
+        dark_rows = np.concatenate(([0], dark.any(axis=1).astype(np.int8), [0]))
+        edges = np.flatnonzero(np.diff(dark_rows))
+        page = []
+        for top, bottom in zip(edges[::2].tolist(), edges[1::2].tolist()):
+            columns = np.flatnonzero(dark[top:bottom].any(axis=0))
+            left, right = int(columns[0]), int(columns[-1]) + 1
+            # Glyph count: unlike pixel counts, compression noise rarely changes it.
+            glyphs = cv2.connectedComponents(dark[top:bottom].astype(np.uint8))[0] - 1
+            words = [WORDS[(glyphs + k * 7) % len(WORDS)] for k in range(2 + glyphs % 3)]
+            box = [[left, top], [right, top], [right, bottom], [left, bottom]]
+            page.append([box, (" ".join(words), 0.99)])
+        return [page]
+
+
+class StubWhisperModel:
+    """faster-whisper-shaped model that emits a segment per burst of speech energy."""
+
+    window = WHISPER_SAMPLE_RATE * 30 // 1000
+    max_segment_seconds = 8.0
+
+    def transcribe(
+        self, audio: np.ndarray | str, language: str | None = None, word_timestamps: bool = False
+    ) -> tuple:
+        samples = read_wav(Path(audio)) if isinstance(audio, str) else audio
+        segments = self._segments(samples, word_timestamps)
+        return segments, SimpleNamespace(language=language or "en")
+
+    def _segments(self, samples: np.ndarray, word_timestamps: bool) -> Iterator[SimpleNamespace]:
+        count = len(samples) // self.window
+        frames = samples[: count * self.window].reshape(count, self.window)
+        voiced = np.sqrt(np.mean(np.square(frames), axis=1)) > 0.02
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+        step = self.window / WHISPER_SAMPLE_RATE
+        index = 0
+        for begin, end in zip(edges[::2], edges[1::2]):
+            start, stop = float(begin * step), float(end * step)
+            while start < stop:
+                until = min(start + self.max_segment_seconds, stop)
+                words = [
+                    WORDS[(index * 5 + k) % len(WORDS)]
+                    for k in range(int((until - start) * 2.5) + 1)
+                ]
+                # Words share the segment's duration evenly, as faster-whisper's do roughly.
+                edges = np.linspace(start, until, len(words) + 1).tolist()
+                timed = [
+                    SimpleNamespace(word=" " + word, start=edges[k], end=edges[k + 1])
+                    for k, word in enumerate(words)
+                ]
+                yield SimpleNamespace(
+                    text=" " + " ".join(words),
+                    start=start,
+                    end=until,
+                    words=timed if word_timestamps else None,
+                )
+                index += 1
+                start = until
+
+
+def preload_stubs(settings: Settings, models: ModelManager) -> None:
+    """Make the stubs resident under the keys the analyzers load their models by."""
+    cfg = settings.models
+    whisper_key = ("whisper", cfg.whisper_model, cfg.device, cfg.whisper_cpu_threads)
+    with models.acquire(whisper_key, "whisper:stub", StubWhisperModel):
+        pass
+    for slot in range(max(cfg.ocr_workers, 1)):
+        key = ("paddleocr", cfg.ocr_lang, cfg.device, cfg.ocr_batch_size, slot)
+        with models.acquire(key, f"paddleocr:stub #{slot}", StubOcrEngine):
+            pass
+
+
+# endregion
+# region measurement
+@contextmanager
+def measure(stages: dict, sampler: RssSampler, name: str) -> Iterator[dict]:
+    """Record wall time and memory growth of the enclosed block in ``stages``.
+
+    ``peak_mb`` is the peak RSS above the level at stage start; ``traced_mb`` is
+    the same for Python allocations, when tracemalloc is running.
+    """
+    stats: dict = {}
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        traced_before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    with sampler.window() as window:
+        rss_before = window.peak
+        yield stats
+    stats["seconds"] = round(time.perf_counter() - start, 4)
+    rss_after = current_rss_bytes()
+    stats["peak_mb"] = round((window.peak - rss_before) / 1024**2, 1)
+    stats["rss_mb"] = round(rss_after / 1024**2, 1)
+    if tracemalloc.is_tracing():
+        stats["traced_mb"] = round(
+            (tracemalloc.get_traced_memory()[1] - traced_before) / 1024**2, 1
+        )
+    stages[name] = stats
+    extra = " ".join(
+        f"{k}={v}" for k, v in stats.items() if k not in ("seconds", "peak_mb", "rss_mb")
+    )
+    print(
+        f"{name:>15}: {stats['seconds']:8.3f}s {stats['peak_mb']:7.1f} MB peak "
+        f"{stats['rss_mb']:7.1f} MB rss  {extra}"
+    )
+
+
+def git_revision() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def compare(current: dict, baseline: dict, max_slowdown: float) -> list[str]:
+    """Stages whose time or peak memory grew more than ``max_slowdown`` times."""
+    regressions = []
+    for name, stats in current["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if not before:
+            continue
+        ratio = stats["seconds"] / before["seconds"] if before["seconds"] else 1.0
+        slower = stats["seconds"] - before["seconds"] > _NOISE_FLOOR_SECONDS
+        print(f"{name:>15}: {before['seconds']:8.3f}s -> {stats['seconds']:8.3f}s ({ratio:.2f}x)")
+        if slower and ratio > max_slowdown:
+            regressions.append(f"{name} time {ratio:.2f}x")
+        if stats.get("peak_mb") and before.get("peak_mb"):
+            growth = stats["peak_mb"] / before["peak_mb"]
+            if growth > max_slowdown and stats["peak_mb"] - before["peak_mb"] > 1.0:
+                regressions.append(f"{name} peak memory {growth:.2f}x")
+    return regressions
+
+
+# endregion
+
+
+def run(args: argparse.Namespace, work: Path) -> dict:
+    settings = Settings(
+        paths=StoragePaths(
+            root=work,
+            raw_dir=work / "raw",
+            processed_dir=work / "processed",
+            temp_dir=work / "tmp",
+            cache_dir=work / "cache",
+        )
+    )
+    settings.paths.ensure()
+    settings.extract.frame_strategy = args.strategy
+    settings.extract.in_memory_frames = args.in_memory_frames
+    settings.models.device = args.device
+    settings.models.vlm_model = "none"
+    settings.models.ocr_incremental = not args.full_ocr
+    settings.cache.enabled = False
+
+    seconds = args.minutes * 60
+    stages: dict = {}
+    lecture = work / "raw"
+    video = lecture / "slides.mp4"
+    wav = lecture / "speech.wav"
+    # Rendering the lecture is setup, not a pipeline stage, so it is not compared.
+    began = time.perf_counter()
+    changes = write_video(
+        video,
+        seconds,
+        args.slide_seconds,
+        args.fps,
+        (args.width, args.height),
+        args.seed,
+        args.reveal_bullets,
+    )
+    write_wav(wav, synthetic_speech(seconds, args.seed))
+    lecture_info = {
+        "seconds": seconds,
+        "slides": len(changes),
+        "synthesize_seconds": round(time.perf_counter() - began, 3),
+    }
+    ffmpeg = shutil.which(settings.ffmpeg_binary)
+    if ffmpeg:
+        muxed = lecture / "lecture.mp4"
+        subprocess.run(
+            [
+                ffmpeg,
+                "-loglevel",
+                "error",
+                "-y",
+                "-i",
+                str(video),
+                "-i",
+                str(wav),
+                "-c:v",
+                "copy",
+                "-c:a",
+                "aac",
+                "-shortest",
+                str(muxed),
+            ],
+            check=True,
+        )
+        video = muxed
+
+    models = ModelManager()
+    # Sampling sees native allocations (OpenCV, ReportLab, NumPy) at negligible
+    # cost, unlike tracemalloc, which slows Python-heavy stages several times over.
+    sampler = RssSampler(interval=0.005)
+    if not args.real_models:
+        preload_stubs(settings, models)
+    extractor = MediaExtractor(settings)
+    out = settings.paths.processed_dir / "bench"
+
+    with measure(stages, sampler, "frames") as stats:
+        frames = extractor.extract_frames(video, out / "frames")
+        stats["items"] = len(frames)
+    with measure(stages, sampler, "dedup") as stats:
+        frames = FrameDeduplicator(settings).deduplicate(frames, out / "frames" / "slides.json")
+        stats["items"] = len(frames)
+    with measure(stages, sampler, "audio") as stats:
+        # Without ffmpeg the synthetic track is read from its WAV instead.
+        audio = extractor.decode_audio(video, WHISPER_SAMPLE_RATE) if ffmpeg else read_wav(wav)
+        stats["source"] = "ffmpeg" if ffmpeg else "wav"
+        stats["audio_seconds"] = round(len(audio) / WHISPER_SAMPLE_RATE, 1)
+    with measure(stages, sampler, "ocr") as stats:
+        analysis = AnalysisStats()
+        slides = SlideAnalyzer(settings, models).analyze(frames, analysis)
+        stats["items"] = len(slides)
+        stats.update({f"ocr_{mode}": count for mode, count in analysis.ocr_modes.items()})
+    with measure(stages, sampler, "transcribe") as stats:
+        transcript = WhisperTranscriber(settings, models).transcribe(audio)
+        stats["items"] = len(transcript)
+    with measure(stages, sampler, "align") as stats:
+        grouped = align_transcript(slides, transcript)
+        stats["items"] = sum(len(group) for group in grouped)
+    with measure(stages, sampler, "slide_pdf") as stats:
+        path = SlidePdfBuilder(settings).build(slides, out / "slides.pdf")
+        stats["bytes"] = path.stat().st_size
+    with measure(stages, sampler, "transcript_pdf") as stats:
+        path = TranscriptPdfBuilder(settings).build(transcript, out / "transcript.pdf")
+        stats["bytes"] = path.stat().st_size
+    with measure(stages, sampler, "combined_pdf") as stats:
+        path = CombinedPdfBuilder(settings).build(slides, grouped, out / "combined.pdf")
+        stats["bytes"] = path.stat().st_size
+
+    return {
+        "revision": git_revision(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "keep")},
+        "lecture": lecture_info,
+        "stages": stages,
+        "pipeline_seconds": round(sum(stats["seconds"] for stats in stages.values()), 3),
+        # ru_maxrss is in KiB on Linux.
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=5.0, help="synthetic lecture length")
+    parser.add_argument("--slide-seconds", type=float, default=20.0, help="mean time per slide")
+    parser.add_argument("--fps", type=int, default=10)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--strategy", choices=["scene", "interval"], default="scene")
+    parser.add_argument("--in-memory-frames", action="store_true")
+    parser.add_argument(
+        "--reveal-bullets", action="store_true", help="reveal each slide's bullets one at a time"
+    )
+    parser.add_argument(
+        "--full-ocr", action="store_true", help="OCR every frame in full (no region diffing)"
+    )
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument(
+        "--real-models",
+        action="store_true",
+        help="use PaddleOCR and faster-whisper instead of stubs",
+    )
+    parser.add_argument(
+        "--trace-python",
+        action="store_true",
+        help="also trace Python allocations (tracemalloc; slows Python-heavy stages)",
+    )
+    parser.add_argument("--output", type=Path, default=Path("benchmark-pipeline.json"))
+    parser.add_argument("--baseline", type=Path, help="earlier result to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=1.5)
+    parser.add_argument("--keep", type=Path, help="keep the lecture and outputs in this directory")
+    args = parser.parse_args()
+
+    if args.trace_python:
+        tracemalloc.start()
+    if args.keep:
+        args.keep.mkdir(parents=True, exist_ok=True)
+        result = run(args, args.keep.resolve())
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            result = run(args, Path(tmp))
+    tracemalloc.stop()
+
+    args.output.write_text(json.dumps(result, indent=2))
+    print(
+        f"pipeline {result['pipeline_seconds']:.2f}s, "
+        f"max RSS {result['max_rss_mb']:.0f} MB -> {args.output}"
+    )
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        print(f"compared with {args.baseline} ({baseline.get('revision') or 'unknown revision'})")
+        regressions = compare(result, baseline, args.max_slowdown)
+        if regressions:
+            print("regressions: " + ", ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
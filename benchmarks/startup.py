@@ -0,0 +1,78 @@
+"""CLI startup-time benchmark.
+
+Runs lightweight CLI commands in fresh interpreters and fails (exit code 1)
+when the median wall time exceeds the budget, or when importing the CLI pulls
+in any of the heavy inference/media stacks.
+
+    python benchmarks/startup.py --runs 5 --budget 1.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+COMMANDS = {
+    "--help": [sys.executable, "-m", "app.cli", "--help"],
+    "paths": [sys.executable, "-m", "app.cli", "paths"],
+}
+
+HEAVY_MODULES = (
+    "faster_whisper",
+    "paddleocr",
+    "transformers",
+    "torch",
+    "cv2",
+    "reportlab",
+    "langchain",
+)
+
+
+def time_command(cmd: list[str], runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def heavy_imports() -> list[str]:
+    probe = (
+        "import sys, app.cli; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", probe], cwd=ROOT, check=True, capture_output=True, text=True
+    )
+    return [name for name in out.stdout.strip().split(",") if name]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="median seconds per command")
+    args = parser.parse_args()
+
+    failed = False
+    for label, cmd in COMMANDS.items():
+        median = statistics.median(time_command(cmd, args.runs))
+        status = "ok" if median <= args.budget else "OVER BUDGET"
+        failed |= median > args.budget
+        print(f"{label:>8}: median {median:.3f}s over {args.runs} runs [{status}]")
+
+    loaded = heavy_imports()
+    if loaded:
+        failed = True
+        print(f"importing app.cli loaded heavy modules: {', '.join(loaded)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
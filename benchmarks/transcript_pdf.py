@@ -0,0 +1,98 @@
+"""Transcript PDF rendering benchmark.
+
+Renders synthetic transcripts of increasing length with the canvas and platypus
+engines and reports wall time, peak traced memory and pages per second. Exits
+with code 1 when canvas time per segment grows more than ``--max-growth`` times
+from the smallest to the largest transcript (i.e. stops scaling linearly).
+
+    python benchmarks/transcript_pdf.py --segments 500 2000 8000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.config import Settings  # noqa: E402
+from app.models.audio import TranscriptSegment  # noqa: E402
+from app.pdf.transcript import TranscriptPdfBuilder  # noqa: E402
+
+WORDS = (
+    "the gradient of the loss with respect to each weight tells us how to update "
+    "parameters so that next iteration reduces error on training examples while "
+    "regularization keeps model simple enough to generalize beyond observed data"
+).split()
+
+
+def synthetic_segments(count: int, seed: int = 0) -> list[TranscriptSegment]:
+    rng = random.Random(seed)
+    segments = []
+    start = 0.0
+    for _ in range(count):
+        duration = rng.uniform(2.0, 6.0)
+        text = " ".join(rng.choices(WORDS, k=rng.randint(6, 24)))
+        segments.append(TranscriptSegment(text, round(start, 2), round(start + duration, 2)))
+        start += duration
+    return segments
+
+
+def run_engine(engine: str, segments: list[TranscriptSegment], out_dir: Path) -> dict:
+    settings = Settings()
+    settings.pdf.transcript_engine = engine
+    builder = TranscriptPdfBuilder(settings)
+    output = out_dir / f"{engine}-{len(segments)}.pdf"
+    tracemalloc.start()
+    start = time.perf_counter()
+    builder.build(iter(segments), output)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    pages = output.read_bytes().count(b"/Type /Page\n")
+    return {"seconds": seconds, "peak_mb": peak / 1024**2, "pages": pages}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segments", type=int, nargs="+", default=[500, 2000, 8000])
+    parser.add_argument(
+        "--engines", nargs="+", default=["canvas", "platypus"], choices=["canvas", "platypus"]
+    )
+    parser.add_argument(
+        "--max-growth", type=float, default=2.0, help="allowed growth of canvas s/segment"
+    )
+    args = parser.parse_args()
+
+    per_segment: list[float] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in sorted(args.segments):
+            segments = synthetic_segments(count)
+            for engine in args.engines:
+                stats = run_engine(engine, segments, Path(tmp))
+                rate = stats["pages"] / stats["seconds"] if stats["seconds"] else 0.0
+                print(
+                    f"{engine:>8} {count:>6} segments: {stats['seconds']:7.2f}s "
+                    f"{stats['peak_mb']:6.1f} MB peak {stats['pages']:>5} pages "
+                    f"({rate:.0f} pages/s)"
+                )
+                if engine == "canvas":
+                    per_segment.append(stats["seconds"] / count)
+
+    if len(per_segment) > 1 and per_segment[-1] > per_segment[0] * args.max_growth:
+        print(
+            f"canvas time per segment grew {per_segment[-1] / per_segment[0]:.1f}x "
+            f"(limit {args.max_growth}x)"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())